@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+图像分析加速内核
+使用Numba将多参考图像的颜色差异计算编译为并行机器码（可选依赖）
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+    prange = range
+
+NUMBA_AVAILABLE = njit is not None
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def multi_ref_color_difference(refs_rgb, cur_rgb):
+        """
+        计算当前图像与每个参考图像的平均绝对颜色差异
+
+        Args:
+            refs_rgb: 参考图像堆叠 (N, H, W, 3) uint8
+            cur_rgb: 当前图像 (H, W, 3) uint8
+
+        Returns:
+            每个参考图像的颜色差异 (N,) float64，与cv2.norm(NORM_L1)/像素数一致
+        """
+        n, h, w, c = refs_rgb.shape
+        result = np.empty(n, dtype=np.float64)
+        for k in prange(n):
+            total = 0
+            for y in range(h):
+                for x in range(w):
+                    for ch in range(c):
+                        diff = np.int32(refs_rgb[k, y, x, ch]) - np.int32(cur_rgb[y, x, ch])
+                        total += diff if diff >= 0 else -diff
+            result[k] = total / (h * w * c)
+        return result
+else:
+    multi_ref_color_difference = None
@@ -26,6 +26,9 @@ class AutoHunter:
         self.hunt_count = 0
         self.hunt_thread = None
         
+        # pygame模块缓存（播放BGM时延迟导入）
+        self._pygame = None
+        
         # 回调函数
         self.on_hunt_start = None
         self.on_hunt_stop = None
@@ -195,6 +198,8 @@ class AutoHunter:
         
         finally:
             self.is_hunting = False
+            # 每次开始/继续刷闪都会新建线程，退出时关闭本线程的MSS实例
+            self.screenshot_manager.release_thread_resources()
     
     def _wait_with_cancel(self, seconds: float, action: str = ""):
         """等待指定时间，支持取消和倒计时显示"""
@@ -280,6 +285,8 @@ class AutoHunter:
             
             # 所有重试都失败，返回最终结果
             self.logger.info(f"经过 {retry_count + 1} 次尝试，仍有区域分析失败")
+            # 失败图像会被界面读取，确保后台写盘已完成
+            self.screenshot_manager.flush_pending_saves()
             return {
                 'has_failure': True,
                 'success_count': success_count,
@@ -317,8 +324,10 @@ class AutoHunter:
     def _play_shiny_bgm(self):
         """播放闪光BGM音乐"""
         try:
-            import pygame
-            import threading
+            if self._pygame is None:
+                import pygame
+                self._pygame = pygame
+            pygame = self._pygame
             
             def play_music():
                 try:
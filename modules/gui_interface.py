@@ -11,19 +11,48 @@ import logging
 from typing import Optional, List
 from PIL import Image, ImageTk
 import threading
+import heapq
+import collections
+from concurrent.futures import ThreadPoolExecutor
+import functools
 import json
+import csv
+import io
+import re
+import errno
 import time
 import os
 import shutil
-import pandas as pd
+from openpyxl import Workbook, load_workbook
 from datetime import datetime
+from pathlib import Path
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 from .image_analyzer import ImageAnalyzer
+from .analyzer_kernels import NUMBA_AVAILABLE
 from .probability_calculator import ProbabilityCalculator
 
 class MainGUI:
     """主界面类"""
     
+    # 时间轴动作类型（保持顺序供下拉框使用）及插入位置
+    _ACTION_TYPES = ('initial_delay', 'reset', 'quick_load', 'confirm', 'analysis', 'custom_delay')
+    _POSITIONS = ('beginning', 'end', 'after_selected')
+    
+    # 可导入为参考图像的文件扩展名
+    _IMG_EXTS = ('.png', '.jpg', '.jpeg', '.bmp', '.gif', '.tiff')
+    
+    # 状态日志文本框的行数上限，超过后只保留最近的行
+    _LOG_MAX_LINES = 2000
+    _LOG_KEEP_LINES = 1500
+    
+    # 出闪历史记录的列名
+    _HISTORY_COLUMNS = ['时间', '刷闪次数', '世代', '判定数', '累积概率(%)', '称号', '截图路径']
+    
     def __init__(self, root, app_instance):
         self.root = root
         self.app = app_instance
@@ -36,14 +65,43 @@ class MainGUI:
         self.is_capturing = False
         self.analysis_results = []
         
+        # 错判图像命名时的中文->英文替换表（单次正则扫描完成全部替换）
+        self._region_name_map = {'区域': 'region', '第': 'attempt', '次判断': 'judgment'}
+        self._region_translit = re.compile('|'.join(map(re.escape, self._region_name_map)))
+        
         # 刷闪次数重置标志
         self.should_reset_count = False  # 默认需要重置，只有在导入暂停信息时才设为False
         
+        # pygame模块缓存（播放BGM时延迟导入）
+        self._pygame = None
+        
+        # 批量添加参考图像时暂停列表刷新，结束后统一重建一次
+        self._suspend_list_updates = False
+        
+        # 区域列表/参考图像列表上次渲染的内容，用于增量更新
+        self._region_rows = []
+        self._reference_names = []
+        
+        # 状态日志缓冲区（空闲时批量写入文本框）
+        self._log_buffer = collections.deque()
+        self._log_flush_pending = False
+        # 挂机线程也会写日志，调度标志的检查和设置需要加锁
+        self._log_flush_lock = threading.Lock()
+        
+        # 防抖回调的after id（键 -> id）
+        self._debounce_ids = {}
+        
+        # 阈值标签是否已有待执行的空闲刷新
+        self._threshold_update_pending = False
+        
         # 用户偏好配置
         self.user_preferences = self._load_user_preferences()
         
         # 概率计算器
         self.probability_calculator = ProbabilityCalculator()
+        # 称号/累积概率缓存，(世代, 刷闪次数, 判定数) 相同时直接复用计算结果
+        self._title_cache = functools.lru_cache(maxsize=4096)(
+            self.probability_calculator.get_title_by_hunt_count)
         
         # 概率相关变量
         self.generation_var = tk.StringVar(value="6")
@@ -63,7 +121,6 @@ class MainGUI:
         except:
             # 如果ICO文件不存在，尝试使用PNG
             try:
-                from PIL import Image, ImageTk
                 icon_image = Image.open('configs/icons/app_icon.png')
                 icon_photo = ImageTk.PhotoImage(icon_image)
                 self.root.iconphoto(True, icon_photo)
@@ -213,6 +270,11 @@ class MainGUI:
                        background=self.colors['light'],
                        foreground=self.colors['accent'],
                        font=('Segoe UI', 9, 'bold'))
+        
+        # 配置时间轴列表样式 - 固定行高，插入时无需逐行测量
+        style.configure('Timeline.Treeview',
+                       rowheight=22,
+                       font=('Segoe UI', 9))
     
     def create_interface(self):
         """创建主界面"""
@@ -271,6 +333,9 @@ class MainGUI:
         ttk.Button(count_frame, text="重置计数", 
                   command=self.reset_hunt_count).pack(side=tk.RIGHT, padx=5)
         
+        ttk.Button(count_frame, text="导出出闪历史", 
+                  command=self.export_history_excel).pack(side=tk.RIGHT, padx=5)
+        
         # 自动刷闪控制
         control_buttons_frame = ttk.Frame(auto_frame)
         control_buttons_frame.pack(fill=tk.X, padx=5, pady=2)
@@ -381,7 +446,8 @@ class MainGUI:
         judgment_entry = ttk.Entry(prob_config_grid_frame, textvariable=self.judgment_count_var, 
                                   width=8, style='Modern.TEntry')
         judgment_entry.grid(row=0, column=3, padx=2)
-        judgment_entry.bind('<KeyRelease>', self._update_probability_display)
+        judgment_entry.bind('<KeyRelease>', lambda e: self._debounce(
+            'prob', 200, self._update_probability_display))
         
         # 累积概率显示
         ttk.Label(prob_config_grid_frame, text="累积概率:", style='Modern.TLabel').grid(row=0, column=4, sticky=tk.W, padx=2)
@@ -428,6 +494,16 @@ class MainGUI:
         self.countdown_remaining = 0
         self.countdown_total = 0
         self.countdown_action = ""
+        self.countdown_end = 0.0
+        # _set_if_changed 使用的显示缓存
+        self._countdown_text = None
+        self._title_text = None
+        self._probability_text = None
+        self._color_sim_text = None
+        self._ssim_text = None
+        self._color_diff_text = None
+        # 上次概率计算的输入(世代, 刷闪次数, 判定数)
+        self._last_prob_key = None
         
         # 为输入框添加验证
         self._setup_input_validation()
@@ -625,6 +701,25 @@ class MainGUI:
         self.capture_interval_var = tk.DoubleVar(value=1.0)
         ttk.Spinbox(other_frame, from_=0.1, to=10.0, increment=0.1, 
                    textvariable=self.capture_interval_var).grid(row=0, column=1, padx=5, pady=5)
+        
+        # Numba加速（可选依赖，首次分析时需要编译数秒，编译结果缓存到磁盘后再次启动不再编译）
+        use_numba = NUMBA_AVAILABLE and bool(self.user_preferences.get("use_numba_kernels", False))
+        self.app.image_analyzer.use_numba_kernels = use_numba
+        self.use_numba_var = tk.BooleanVar(value=use_numba)
+        numba_text = "使用Numba加速多参考图像颜色差异（首次分析需编译数秒）"
+        if not NUMBA_AVAILABLE:
+            numba_text += "（未安装numba）"
+        ttk.Checkbutton(other_frame, text=numba_text, variable=self.use_numba_var,
+                        command=self._toggle_numba_kernels,
+                        state=tk.NORMAL if NUMBA_AVAILABLE else tk.DISABLED).grid(
+            row=1, column=0, columnspan=2, padx=5, pady=5, sticky=tk.W)
+    
+    def _toggle_numba_kernels(self):
+        """切换是否使用Numba颜色差异内核，并记入用户偏好"""
+        enabled = self.use_numba_var.get()
+        self.app.image_analyzer.use_numba_kernels = enabled
+        self._update_preference("use_numba_kernels", enabled)
+        self.log_message(f"Numba加速已{'开启' if enabled else '关闭'}")
     
     # 控制面板方法
     def quick_load_save(self):
@@ -761,9 +856,6 @@ class MainGUI:
     def _save_pause_state(self):
         """保存暂停状态到可导入的文件夹"""
         try:
-            import json
-            from datetime import datetime
-            
             # 创建暂停状态文件夹
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             pause_dir = f"configs/pause_{timestamp}"
@@ -783,13 +875,12 @@ class MainGUI:
             # 2. 保存参考图像
             reference_images = self.app.image_analyzer.get_reference_list()
             if reference_images:
-                import shutil
                 for ref_name in reference_images:
                     ref_data = self.app.image_analyzer.reference_images[ref_name]
                     ref_path = ref_data['path']
                     if os.path.exists(ref_path):
                         # 复制参考图像
-                        shutil.copy2(ref_path, os.path.join(pause_dir, f"{ref_name}.png"))
+                        self._fast_copy(ref_path, os.path.join(pause_dir, f"{ref_name}.png"))
             
             # 3. 保存阈值设置
             thresholds = self.app.image_analyzer.get_thresholds()
@@ -806,8 +897,7 @@ class MainGUI:
                 })
             
             screenshot_config = {"regions": regions}
-            with open(os.path.join(pause_dir, "screenshootposition.json"), 'w', encoding='utf-8') as f:
-                json.dump(screenshot_config, f, ensure_ascii=False, indent=2)
+            self._dump_json_buffered(screenshot_config, os.path.join(pause_dir, "screenshootposition.json"))
             
             # 5. 保存时间轴配置
             timeline_config = {
@@ -815,8 +905,7 @@ class MainGUI:
                 "retry_count": int(self.retry_count_var.get()),
                 "retry_interval": float(self.retry_interval_var.get())
             }
-            with open(os.path.join(pause_dir, "timeline.json"), 'w', encoding='utf-8') as f:
-                json.dump(timeline_config, f, ensure_ascii=False, indent=2)
+            self._dump_json_buffered(timeline_config, os.path.join(pause_dir, "timeline.json"))
             
             # 6. 保存概率配置
             gen_config = {
@@ -832,6 +921,75 @@ class MainGUI:
             self.logger.error(f"保存暂停状态失败: {e}")
             raise e
     
+    def _remove_existing_target(self, src, dst):
+        """删除已存在的目标文件（可能是硬链接，直接覆盖写入会改到共享同一inode的文件），
+        目标与源是同一文件时返回False"""
+        if os.path.lexists(dst):
+            if os.path.exists(dst) and os.path.samefile(src, dst):
+                return False
+            os.unlink(dst)
+        return True
+    
+    def _fast_copy(self, src, dst):
+        """复制图像文件：同一文件系统上优先创建硬链接（仅元数据操作），否则回退到完整复制"""
+        if not self._remove_existing_target(src, dst):
+            return
+        try:
+            os.link(src, dst)
+        except OSError as e:
+            # 跨设备、权限不足或文件系统不支持硬链接时回退
+            if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK,
+                               errno.ENOTSUP, errno.EACCES) and os.name != 'nt':
+                raise
+            self._copy_file(src, dst)
+    
+    def _copy_file(self, src, dst):
+        """完整复制文件并保留元数据：Linux上用copy_file_range在内核中复制，否则使用1MB缓冲区"""
+        if not self._remove_existing_target(src, dst):
+            return
+        with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+            copied = False
+            if hasattr(os, 'copy_file_range'):
+                try:
+                    while os.copy_file_range(fsrc.fileno(), fdst.fileno(), 1 << 30):
+                        pass
+                    copied = True
+                except OSError as e:
+                    # 内核或文件系统不支持时回退到缓冲复制
+                    if e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL,
+                                       errno.ENOTSUP, errno.EOPNOTSUPP):
+                        raise
+                    fsrc.seek(0)
+                    fdst.seek(0)
+                    fdst.truncate()
+            if not copied:
+                shutil.copyfileobj(fsrc, fdst, 1 << 20)
+        shutil.copystat(src, dst)
+    
+    def _dump_json_buffered(self, obj, path):
+        """通过1MB缓冲区流式写入JSON（时间轴/区域列表较大时避免大量小块写入）"""
+        with open(path, 'wb') as raw, io.BufferedWriter(raw, buffer_size=1 << 20) as buf:
+            f = io.TextIOWrapper(buf, encoding='utf-8')
+            json.dump(obj, f, ensure_ascii=False, indent=2)
+            f.flush()
+            f.detach()
+    
+    def _load_json_file(self, path):
+        """读取JSON文件：一次性读入全部字节再解析（优先使用orjson，未安装时回退到json）"""
+        data = Path(path).read_bytes()
+        if orjson is not None:
+            return orjson.loads(data)
+        return json.loads(data.decode('utf-8'))
+    
+    def _dump_json_file(self, obj, path):
+        """写入JSON文件（优先使用orjson，未安装时回退到json）"""
+        if orjson is not None:
+            with open(path, 'wb') as f:
+                f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+            return
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(obj, f, indent=2, ensure_ascii=False)
+    
     def stop_auto_hunt(self):
         """停止自动刷闪"""
         self.app.auto_hunter.stop_hunting()
@@ -857,12 +1015,9 @@ class MainGUI:
     def _load_user_preferences(self):
         """加载用户偏好配置"""
         try:
-            import json
-            import os
             prefs_file = "configs/user_preferences.json"
             if os.path.exists(prefs_file):
-                with open(prefs_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                return self._load_json_file(prefs_file)
             else:
                 # 返回默认配置
                 return {
@@ -888,8 +1043,6 @@ class MainGUI:
     def _save_user_preferences(self):
         """保存用户偏好配置"""
         try:
-            import json
-            import os
             os.makedirs("configs", exist_ok=True)
             prefs_file = "configs/user_preferences.json"
             with open(prefs_file, 'w', encoding='utf-8') as f:
@@ -930,11 +1083,21 @@ class MainGUI:
         self.display_analysis_results(analysis_results)
         self.log_message(f"第{attempt}次分析完成，共{len(analysis_results)}个区域")
     
+    def _unpack_result(self, result):
+        """一次性解包分析结果中常用的字段
+        
+        Returns:
+            (失败区域, 成功数, 区域总数, 分析尝试次数, 失败图像)
+        """
+        return (result.get('failed_regions', []),
+                result.get('success_count', 0),
+                result.get('total_regions', 0),
+                result.get('attempt_count', 1),
+                result.get('failed_images', []))
+    
     def on_hunt_result(self, result):
         """自动刷闪结果回调"""
-        failed_regions = result.get('failed_regions', [])
-        success_count = result.get('success_count', 0)
-        attempt_count = result.get('attempt_count', 1)
+        failed_regions, success_count, _, attempt_count, _ = self._unpack_result(result)
         
         if failed_regions:
             # 显示自定义结果对话框
@@ -944,11 +1107,8 @@ class MainGUI:
     
     def _show_shiny_result_dialog(self, result):
         """显示闪光检测结果对话框"""
-        failed_regions = result.get('failed_regions', [])
-        success_count = result.get('success_count', 0)
-        total_regions = result.get('total_regions', 0)
-        attempt_count = result.get('attempt_count', 1)
-        failed_images = result.get('failed_images', [])
+        failed_regions, success_count, total_regions, attempt_count, failed_images = \
+            self._unpack_result(result)
         
         # 创建结果对话框
         dialog = tk.Toplevel(self.root)
@@ -977,10 +1137,8 @@ class MainGUI:
         
         # 计算当前称号
         try:
-            generation = int(self.generation_var.get())
-            judgment_count = int(self.judgment_count_var.get())
-            hunt_count = int(self.hunt_count_var.get())
-            title, probability = self.probability_calculator.get_title_by_hunt_count(
+            generation, hunt_count, judgment_count = self._get_probability_inputs()
+            title, probability = self._title_cache(
                 generation, hunt_count, judgment_count
             )
         except:
@@ -1003,64 +1161,9 @@ class MainGUI:
             images_frame = ttk.LabelFrame(main_frame, text="识别失败的图像")
             images_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
             
-            # 创建滚动区域
-            canvas = tk.Canvas(images_frame)
-            scrollbar = ttk.Scrollbar(images_frame, orient="vertical", command=canvas.yview)
-            scrollable_frame = ttk.Frame(canvas)
-            
-            scrollable_frame.bind(
-                "<Configure>",
-                lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-            )
-            
-            canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-            canvas.configure(yscrollcommand=scrollbar.set)
-            
-            # 使用网格布局显示失败图像
-            cols = 3  # 每行显示3个图像
-            for i, (region_name, image_path) in enumerate(failed_images):
-                try:
-                    # 加载并缩放图像
-                    img = Image.open(image_path)
-                    img.thumbnail((120, 120), Image.Resampling.LANCZOS)  # 稍微缩小图像
-                    photo = ImageTk.PhotoImage(img)
-                    
-                    # 计算网格位置
-                    row = i // cols
-                    col = i % cols
-                    
-                    # 创建图像显示框架
-                    img_frame = ttk.Frame(scrollable_frame)
-                    img_frame.grid(row=row, column=col, padx=5, pady=5, sticky="nsew")
-                    
-                    # 区域名称标签
-                    name_label = ttk.Label(img_frame, text=f"{region_name}", 
-                                         font=('Arial', 9, 'bold'), anchor="center")
-                    name_label.pack(pady=(0, 2))
-                    
-                    # 图像标签
-                    img_label = ttk.Label(img_frame, image=photo, anchor="center")
-                    img_label.image = photo  # 保持引用
-                    img_label.pack()
-                    
-                except Exception as e:
-                    self.logger.error(f"加载失败图像 {image_path} 失败: {e}")
-            
-            # 配置网格权重，确保每列等宽
-            for i in range(cols):
-                scrollable_frame.grid_columnconfigure(i, weight=1)
-            
-            # 如果最后一行没有填满，添加空的占位框架
-            total_images = len(failed_images)
-            last_row = (total_images - 1) // cols
-            last_row_items = total_images % cols
-            if last_row_items > 0:  # 最后一行没有填满
-                for col in range(last_row_items, cols):
-                    empty_frame = ttk.Frame(scrollable_frame)
-                    empty_frame.grid(row=last_row, column=col, padx=5, pady=5, sticky="nsew")
-            
-            canvas.pack(side="left", fill="both", expand=True)
-            scrollbar.pack(side="right", fill="y")
+            # 按需渲染的缩略图网格（只实例化可见行）
+            self._create_lazy_thumbnail_grid(images_frame, failed_images, cols=3,
+                                             thumb_size=(120, 120), row_height=160)
         
         # 按钮框架
         button_frame = ttk.Frame(main_frame)
@@ -1078,15 +1181,128 @@ class MainGUI:
                                 style='Success.TButton')
         confirm_btn.pack(side=tk.LEFT)
     
+    def _create_lazy_thumbnail_grid(self, parent, images, cols=3, thumb_size=(120, 120), row_height=160):
+        """
+        创建可滚动的缩略图网格，只为可见行创建控件
+        
+        滚动或窗口尺寸变化时创建进入视口的行，离开视口的行只隐藏、放入行池，
+        回到视口时直接重新显示，无需再次读取和缩放图像；行池超过上限时
+        销毁距视口最远的行，实例化开销只与可见行数相关，与图像总数无关。
+        
+        Args:
+            parent: 父容器
+            images: (区域名称, 图像路径) 列表
+            cols: 每行显示的图像数
+            thumb_size: 缩略图最大尺寸
+            row_height: 每行的固定高度（像素）
+        """
+        canvas = tk.Canvas(parent)
+        scrollbar = ttk.Scrollbar(parent, orient="vertical")
+        
+        total_rows = (len(images) + cols - 1) // cols
+        canvas.configure(scrollregion=(0, 0, 0, total_rows * row_height))
+        
+        # 已创建的行（可见或隐藏）: 行号 -> (画布窗口ID, 行框架)
+        row_windows = {}
+        # 行池中最多保留的隐藏行数
+        max_hidden_rows = 20
+        
+        def on_wheel(event):
+            # Windows的delta为120的倍数，macOS为±1~3，Linux通过Button-4/5传递滚轮（delta为0）；
+            # 按delta的符号决定方向，每次至少滚动一行
+            steps = max(1, abs(event.delta) // 120)
+            if event.num == 4 or event.delta > 0:
+                steps = -steps
+            on_scroll("scroll", steps, "units")
+        
+        def bind_wheel(widget):
+            for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+                widget.bind(sequence, on_wheel)
+        
+        def build_row(row):
+            row_frame = ttk.Frame(canvas)
+            for col in range(cols):
+                row_frame.grid_columnconfigure(col, weight=1, uniform="thumb")
+            
+            for col, (region_name, image_path) in enumerate(images[row * cols:(row + 1) * cols]):
+                # 创建图像显示框架
+                img_frame = ttk.Frame(row_frame)
+                img_frame.grid(row=0, column=col, padx=5, pady=5, sticky="nsew")
+                
+                # 区域名称标签
+                name_label = ttk.Label(img_frame, text=f"{region_name}", 
+                                     font=('Arial', 9, 'bold'), anchor="center")
+                name_label.pack(pady=(0, 2))
+                
+                try:
+                    # 加载并缩放图像
+                    img = Image.open(image_path)
+                    img.thumbnail(thumb_size, Image.Resampling.BILINEAR)  # 小尺寸预览无需LANCZOS
+                    photo = ImageTk.PhotoImage(img)
+                    
+                    # 图像标签
+                    img_label = ttk.Label(img_frame, image=photo, anchor="center")
+                    img_label.image = photo  # 保持引用
+                    img_label.pack()
+                    bind_wheel(img_label)
+                    
+                except Exception as e:
+                    self.logger.error(f"加载失败图像 {image_path} 失败: {e}")
+                
+                # 鼠标停在缩略图上时滚轮也能滚动画布
+                bind_wheel(img_frame)
+                bind_wheel(name_label)
+            
+            bind_wheel(row_frame)
+            window_id = canvas.create_window((0, row * row_height), window=row_frame, anchor="nw")
+            return window_id, row_frame
+        
+        def refresh_visible(event=None):
+            if total_rows == 0:
+                return
+            
+            # 根据视口位置计算可见行范围
+            top, bottom = canvas.yview()
+            first = max(0, int(top * total_rows))
+            last = min(total_rows - 1, int(bottom * total_rows))
+            
+            # 隐藏离开视口的行，行池超过上限时销毁距视口最远的行
+            hidden = [row for row in row_windows if not first <= row <= last]
+            hidden.sort(key=lambda row: min(abs(row - first), abs(row - last)))
+            for row in hidden[max_hidden_rows:]:
+                window_id, row_frame = row_windows.pop(row)
+                canvas.delete(window_id)
+                row_frame.destroy()
+            for row in hidden[:max_hidden_rows]:
+                canvas.itemconfigure(row_windows[row][0], state="hidden")
+            
+            # 创建或重新显示进入视口的行，并让每行铺满画布宽度
+            width = canvas.winfo_width()
+            for row in range(first, last + 1):
+                if row not in row_windows:
+                    row_windows[row] = build_row(row)
+                canvas.itemconfigure(row_windows[row][0], state="normal", width=width)
+        
+        def on_scroll(*args):
+            canvas.yview(*args)
+            refresh_visible()
+        
+        scrollbar.configure(command=on_scroll)
+        canvas.configure(yscrollcommand=scrollbar.set)
+        canvas.bind("<Configure>", refresh_visible)
+        bind_wheel(canvas)
+        
+        canvas.pack(side="left", fill="both", expand=True)
+        scrollbar.pack(side="right", fill="y")
+        
+        return canvas
+    
     def _handle_misjudge(self, dialog, result):
         """处理错判"""
         # 停止BGM播放
         self._stop_bgm()
         
-        failed_regions = result.get('failed_regions', [])
-        failed_images = result.get('failed_images', [])
-        success_count = result.get('success_count', 0)
-        total_regions = result.get('total_regions', 0)
+        failed_regions, _, _, _, failed_images = self._unpack_result(result)
         
         # 关闭当前对话框
         dialog.destroy()
@@ -1147,7 +1363,7 @@ class MainGUI:
                 try:
                     # 加载并缩放图像
                     img = Image.open(image_path)
-                    img.thumbnail((100, 100), Image.Resampling.LANCZOS)
+                    img.thumbnail((100, 100), Image.Resampling.BILINEAR)  # 小尺寸预览无需LANCZOS
                     photo = ImageTk.PhotoImage(img)
                     
                     # 计算网格位置
@@ -1199,28 +1415,35 @@ class MainGUI:
         try:
             added_count = 0
             
-            for region_name, image_path in failed_images:
-                if image_path and os.path.exists(image_path):
-                    # 生成参考图像名称（使用英文避免编码问题）
-                    timestamp = int(time.time())
-                    # 将区域名中的中文字符替换为英文
-                    safe_region_name = region_name.replace("区域", "region").replace("第", "attempt").replace("次判断", "judgment")
-                    ref_name = f"misjudge_{safe_region_name}_{timestamp}"
-                    
-                    # 复制图像到configs目录
-                    configs_dir = "configs"
-                    if not os.path.exists(configs_dir):
-                        os.makedirs(configs_dir)
-                    
-                    # 生成目标路径
-                    ref_image_path = os.path.join(configs_dir, f"{ref_name}.png")
-                    
-                    # 复制图像文件
-                    shutil.copy2(image_path, ref_image_path)
-                    
-                    # 加载为参考图像
-                    self.app.image_analyzer.load_reference_image(ref_name, ref_image_path)
-                    added_count += 1
+            # 确保configs目录存在（循环外只检查一次）
+            configs_dir = "configs"
+            os.makedirs(configs_dir, exist_ok=True)
+            
+            # 同一批次共用时间戳，用序号保证文件名唯一
+            timestamp = int(time.time())
+            
+            # 批量加载期间暂停列表刷新，结束后只重建一次
+            self._suspend_list_updates = True
+            try:
+                for i, (region_name, image_path) in enumerate(failed_images):
+                    if image_path and os.path.exists(image_path):
+                        # 生成参考图像名称（使用英文避免编码问题）
+                        # 将区域名中的中文字符替换为英文
+                        safe_region_name = self._region_translit.sub(
+                            lambda m: self._region_name_map[m.group(0)], region_name)
+                        ref_name = f"misjudge_{safe_region_name}_{timestamp}_{i}"
+                        
+                        # 生成目标路径
+                        ref_image_path = os.path.join(configs_dir, f"{ref_name}.png")
+                        
+                        # 复制图像文件
+                        self._fast_copy(image_path, ref_image_path)
+                        
+                        # 加载为参考图像
+                        self.app.image_analyzer.load_reference_image(ref_name, ref_image_path)
+                        added_count += 1
+            finally:
+                self._suspend_list_updates = False
             
             # 更新参考图像列表显示
             self.update_reference_list()
@@ -1292,9 +1515,6 @@ class MainGUI:
     def _move_to_shining_folder(self, file_path):
         """将闪光图片移动到shining文件夹"""
         try:
-            import shutil
-            from pathlib import Path
-            
             # 创建shining文件夹
             shining_dir = Path("screenshots/shining")
             shining_dir.mkdir(parents=True, exist_ok=True)
@@ -1317,6 +1537,8 @@ class MainGUI:
             
             # 移动文件
             shutil.move(file_path, target_path)
+            # 原路径已失效，下一帧即使画面未变化也需要重新保存
+            self.app.screenshot_manager.forget_path(file_path)
             self.log_message(f"闪光图片已移动到: {target_path}")
             
         except Exception as e:
@@ -1325,8 +1547,7 @@ class MainGUI:
     def _play_shiny_bgm(self):
         """播放闪光BGM音乐"""
         try:
-            import pygame
-            import threading
+            pygame = self._get_pygame()
             
             def play_music():
                 try:
@@ -1356,10 +1577,17 @@ class MainGUI:
         except Exception as e:
             self.logger.error(f"播放BGM失败: {e}")
     
+    def _get_pygame(self):
+        """获取pygame模块（首次使用时导入并缓存，未安装时抛出ImportError）"""
+        if self._pygame is None:
+            import pygame
+            self._pygame = pygame
+        return self._pygame
+    
     def _stop_bgm(self):
         """停止BGM音乐播放"""
         try:
-            import pygame
+            pygame = self._get_pygame()
             
             # 停止音乐播放
             pygame.mixer.music.stop()
@@ -1373,8 +1601,6 @@ class MainGUI:
     def _ask_cleanup_screenshots(self):
         """询问用户是否清理screenshots文件夹"""
         try:
-            from pathlib import Path
-            
             # 检查screenshots文件夹是否存在
             screenshots_dir = Path("screenshots")
             if not screenshots_dir.exists():
@@ -1443,7 +1669,8 @@ class MainGUI:
         
         # 创建时间轴Treeview
         timeline_columns = ('序号', '动作', '延迟(秒)', '描述')
-        timeline_tree = ttk.Treeview(timeline_list_frame, columns=timeline_columns, show='headings', height=8)
+        timeline_tree = ttk.Treeview(timeline_list_frame, columns=timeline_columns, show='headings', height=8,
+                                     style='Timeline.Treeview')
         
         for col in timeline_columns:
             timeline_tree.heading(col, text=col)
@@ -1539,18 +1766,85 @@ class MainGUI:
     
     def _dialog_update_timeline_display(self, timeline_tree):
         """更新对话框中的时间轴显示"""
-        # 清空现有项目
-        for item in timeline_tree.get_children():
-            timeline_tree.delete(item)
-        
-        # 添加时间轴项目
-        for i, action in enumerate(self.timeline_actions):
-            timeline_tree.insert('', 'end', values=(
-                i + 1,
-                action['action'],
-                action['delay'],
-                action['description']
-            ))
+        self._repopulate_timeline_tree(timeline_tree)
+    
+    def _repopulate_timeline_tree(self, timeline_tree):
+        """
+        将时间轴动作同步到Treeview
+        
+        每个动作对象分配一个递增且不复用的iid，并在控件上缓存上次渲染的
+        (动作, iid, 行内容)，只对发生变化的行调用item/insert/move/delete，
+        编辑、移动、增删时只触及受影响的行；iid跟随动作而不是行号，
+        删除或移动后选中状态不会落到其他动作上。
+        首次填充时先将Treeview从布局中移除，全部插入完成后再按原位置放回，
+        使Tk只在最后重绘一次。
+        """
+        rendered = getattr(timeline_tree, '_rendered_rows', None)
+        if rendered is None:
+            # 首次同步：清掉可能存在的非托管项目
+            timeline_tree.delete(*timeline_tree.get_children())
+            rendered = []
+        rows = self.timeline_actions
+        
+        pack_info = None
+        next_sibling = None
+        if not rendered and rows and timeline_tree.winfo_manager() == 'pack':
+            pack_info = timeline_tree.pack_info()
+            siblings = timeline_tree.master.pack_slaves()
+            index = siblings.index(timeline_tree)
+            if index + 1 < len(siblings):
+                next_sibling = siblings[index + 1]
+            timeline_tree.pack_forget()
+        
+        try:
+            # 直接调用Tcl命令，绕过Treeview.item/insert的Python层选项格式化
+            tk_call = timeline_tree.tk.call
+            tree_path = str(timeline_tree)
+            
+            # 按对象身份找回上次渲染的行（缓存持有动作引用，id不会被复用）
+            previous = {id(action): (iid, values) for action, iid, values in rendered}
+            current_ids = {id(action) for action in rows}
+            
+            # 先删除已不存在的动作对应的行
+            removed = [iid for action, iid, _ in rendered if id(action) not in current_ids]
+            if removed:
+                timeline_tree.delete(*removed)
+            order = [iid for action, iid, _ in rendered if id(action) in current_ids]
+            
+            next_iid = getattr(timeline_tree, '_next_iid', 0)
+            new_rendered = []
+            for i, action in enumerate(rows):
+                values = (i + 1, action['action'], action['delay'], action['description'])
+                entry = previous.pop(id(action), None)
+                if entry is None:
+                    # 新动作（或同一对象在列表中重复出现）分配新的iid
+                    iid = f"a{next_iid}"
+                    next_iid += 1
+                    tk_call(tree_path, 'insert', '', i, '-id', iid, '-values', values)
+                    order.insert(i, iid)
+                else:
+                    iid, old_values = entry
+                    if order[i] != iid:
+                        tk_call(tree_path, 'move', iid, '', i)
+                        order.remove(iid)
+                        order.insert(i, iid)
+                    if old_values != values:
+                        tk_call(tree_path, 'item', iid, '-values', values)
+                new_rendered.append((action, iid, values))
+            
+            timeline_tree._next_iid = next_iid
+            timeline_tree._rendered_rows = new_rendered
+        except Exception:
+            # 同步中途失败时丢弃缓存，下次整体重建
+            timeline_tree._rendered_rows = None
+            raise
+        finally:
+            if pack_info is not None:
+                pack_info.pop('in', None)
+                if next_sibling is not None:
+                    timeline_tree.pack(before=next_sibling, **pack_info)
+                else:
+                    timeline_tree.pack(**pack_info)
     
     def _dialog_add_timeline_action(self, timeline_tree):
         """在对话框中添加时间轴动作"""
@@ -1569,7 +1863,7 @@ class MainGUI:
         ttk.Label(main_frame, text="动作类型:").pack(anchor=tk.W, pady=2)
         action_var = tk.StringVar(value="analysis")
         action_combo = ttk.Combobox(main_frame, textvariable=action_var, 
-                                   values=["initial_delay", "reset", "quick_load", "confirm", "analysis"], 
+                                   values=self._ACTION_TYPES, 
                                    state="readonly", width=20)
         action_combo.pack(fill=tk.X, pady=2)
         
@@ -1589,7 +1883,7 @@ class MainGUI:
         ttk.Label(main_frame, text="插入位置:").pack(anchor=tk.W, pady=2)
         position_var = tk.StringVar(value="end")
         position_combo = ttk.Combobox(main_frame, textvariable=position_var, 
-                                     values=["beginning", "end", "after_selected"], 
+                                     values=self._POSITIONS, 
                                      state="readonly", width=20)
         position_combo.pack(fill=tk.X, pady=2)
         
@@ -1610,18 +1904,7 @@ class MainGUI:
                     'description': description_var.get()
                 }
                 
-                position = position_var.get()
-                if position == 'beginning':
-                    self.timeline_actions.insert(0, new_action)
-                elif position == 'end':
-                    self.timeline_actions.append(new_action)
-                elif position == 'after_selected':
-                    selected = timeline_tree.selection()
-                    if selected:
-                        index = timeline_tree.index(selected[0])
-                        self.timeline_actions.insert(index + 1, new_action)
-                    else:
-                        self.timeline_actions.append(new_action)
+                self._insert_timeline_action(new_action, position_var.get(), timeline_tree)
                 
                 self._dialog_update_timeline_display(timeline_tree)
                 add_dialog.destroy()
@@ -1632,6 +1915,23 @@ class MainGUI:
         ttk.Button(button_frame, text="添加", command=add_action, style='Success.TButton').pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="取消", command=add_dialog.destroy, style='Warning.TButton').pack(side=tk.LEFT, padx=5)
     
+    def _insert_timeline_action(self, new_action, position, tree):
+        """按位置插入时间轴动作
+        
+        timeline_actions保持为list：它会被直接序列化为JSON并按下标随机访问，
+        且动作数量通常只有十几个，开头插入的移动开销可以忽略
+        """
+        if position == 'beginning':
+            self.timeline_actions.insert(0, new_action)
+        elif position == 'after_selected':
+            selected = tree.selection()
+            if selected:
+                self.timeline_actions.insert(tree.index(selected[0]) + 1, new_action)
+            else:
+                self.timeline_actions.append(new_action)
+        else:
+            self.timeline_actions.append(new_action)
+    
     def _dialog_edit_timeline_action(self, timeline_tree):
         """在对话框中编辑时间轴动作"""
         selection = timeline_tree.selection()
@@ -1662,7 +1962,7 @@ class MainGUI:
         ttk.Label(main_frame, text="动作类型:").pack(anchor=tk.W, pady=2)
         action_var = tk.StringVar(value=current_action['action'])
         action_combo = ttk.Combobox(main_frame, textvariable=action_var, 
-                                   values=["initial_delay", "reset", "quick_load", "confirm", "analysis"], 
+                                   values=self._ACTION_TYPES, 
                                    state="readonly", width=20)
         action_combo.pack(fill=tk.X, pady=2)
         
@@ -1689,7 +1989,7 @@ class MainGUI:
                     messagebox.showerror("错误", "延迟时间不能为负数")
                     return
                 
-                # 更新动作
+                # 更新动作（替换为新对象，取消配置时的浅拷贝备份不受影响）
                 self.timeline_actions[index] = {
                     'action': action_var.get(),
                     'delay': delay,
@@ -1697,6 +1997,8 @@ class MainGUI:
                 }
                 
                 self._dialog_update_timeline_display(timeline_tree)
+                # 新对象分配了新的iid，重新选中编辑后的动作
+                timeline_tree.selection_set(timeline_tree._rendered_rows[index][1])
                 edit_dialog.destroy()
                 
             except ValueError:
@@ -1708,9 +2010,14 @@ class MainGUI:
     def _dialog_remove_timeline_action(self, timeline_tree):
         """在对话框中删除时间轴动作"""
         selection = timeline_tree.selection()
-        if selection:
-            index = timeline_tree.index(selection[0])
-            if 0 <= index < len(self.timeline_actions):
+        if not selection:
+            messagebox.showwarning("警告", "请先选择要删除的动作")
+            return
+        
+        index = timeline_tree.index(selection[0])
+        if 0 <= index < len(self.timeline_actions):
+            if messagebox.askyesno("确认", "确定要删除选中的动作吗？"):
+                # 被删除动作的行随之删除，选中状态被清空而不会落到下一个动作上
                 del self.timeline_actions[index]
                 self._dialog_update_timeline_display(timeline_tree)
     
@@ -1721,8 +2028,8 @@ class MainGUI:
             index = timeline_tree.index(selection[0])
             if index > 0:
                 self.timeline_actions[index], self.timeline_actions[index-1] = self.timeline_actions[index-1], self.timeline_actions[index]
+                # iid跟随动作移动，选中状态无需重新设置
                 self._dialog_update_timeline_display(timeline_tree)
-                timeline_tree.selection_set(timeline_tree.get_children()[index-1])
     
     def _dialog_move_timeline_down(self, timeline_tree):
         """在对话框中下移时间轴动作"""
@@ -1731,8 +2038,8 @@ class MainGUI:
             index = timeline_tree.index(selection[0])
             if index < len(self.timeline_actions) - 1:
                 self.timeline_actions[index], self.timeline_actions[index+1] = self.timeline_actions[index+1], self.timeline_actions[index]
+                # iid跟随动作移动，选中状态无需重新设置
                 self._dialog_update_timeline_display(timeline_tree)
-                timeline_tree.selection_set(timeline_tree.get_children()[index+1])
     
     def _dialog_reset_timeline_default(self, timeline_tree):
         """在对话框中重置时间轴为默认"""
@@ -1749,56 +2056,84 @@ class MainGUI:
         self._dialog_update_timeline_display(timeline_tree)
     
     def _save_shiny_history(self):
-        """保存出闪历史记录到Excel文件"""
+        """追加出闪历史记录到CSV文件（Excel在导出或退出时统一生成）"""
         try:
             # 获取当前数据
             current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            hunt_count = int(self.hunt_count_var.get())
-            generation = int(self.generation_var.get())
-            judgment_count = int(self.judgment_count_var.get())
+            generation, hunt_count, judgment_count = self._get_probability_inputs()
             
             # 计算概率和称号
-            title, probability = self.probability_calculator.get_title_by_hunt_count(
+            title, probability = self._title_cache(
                 generation, hunt_count, judgment_count
             )
             
             # 获取最新的截图文件路径
             screenshot_paths = self._get_latest_screenshots()
             
-            # 检查history.xlsx是否存在
-            history_file = "history.xlsx"
-            if os.path.exists(history_file):
-                # 读取现有文件
-                df = pd.read_excel(history_file)
-            else:
-                # 创建新的DataFrame
-                df = pd.DataFrame(columns=[
-                    '时间', '刷闪次数', '世代', '判定数', '累积概率(%)', '称号', '截图路径'
+            # 检查history.csv是否存在
+            history_file = "history.csv"
+            is_new_file = not os.path.exists(history_file)
+            
+            with open(history_file, 'a', newline='', encoding='utf-8-sig') as f:
+                writer = csv.writer(f)
+                if is_new_file:
+                    # 新文件写入表头，并迁移已有的history.xlsx记录
+                    writer.writerow(self._HISTORY_COLUMNS)
+                    if os.path.exists("history.xlsx"):
+                        wb = load_workbook("history.xlsx", read_only=True)
+                        writer.writerows(wb.active.iter_rows(min_row=2, values_only=True))
+                        wb.close()
+                
+                # 添加新记录
+                writer.writerow([
+                    current_time,
+                    hunt_count,
+                    generation,
+                    judgment_count,
+                    round(probability, 2),
+                    title,
+                    '; '.join(screenshot_paths) if screenshot_paths else ''
                 ])
             
-            # 添加新记录
-            new_record = {
-                '时间': current_time,
-                '刷闪次数': hunt_count,
-                '世代': generation,
-                '判定数': judgment_count,
-                '累积概率(%)': round(probability, 2),
-                '称号': title,
-                '截图路径': '; '.join(screenshot_paths) if screenshot_paths else ''
-            }
-            
-            # 添加新行
-            df = pd.concat([df, pd.DataFrame([new_record])], ignore_index=True)
-            
-            # 保存到Excel文件
-            df.to_excel(history_file, index=False, engine='openpyxl')
-            
             self.log_message(f"出闪历史记录已保存到 {history_file}")
             
         except Exception as e:
             self.log_message(f"保存出闪历史记录失败: {e}")
             self.logger.error(f"保存出闪历史记录失败: {e}")
     
+    def export_history_excel(self, show_message=True):
+        """将history.csv中的出闪历史导出为history.xlsx"""
+        try:
+            history_file = "history.csv"
+            excel_file = "history.xlsx"
+            if not os.path.exists(history_file):
+                if show_message:
+                    messagebox.showinfo("提示", "暂无出闪历史记录")
+                return
+            
+            wb = Workbook()
+            ws = wb.active
+            with open(history_file, newline='', encoding='utf-8-sig') as f:
+                reader = csv.reader(f)
+                ws.append(next(reader, self._HISTORY_COLUMNS))
+                for row in reader:
+                    # 还原数值列类型，与直接写入Excel时保持一致
+                    try:
+                        row[1:4] = [int(v) for v in row[1:4]]
+                        row[4] = float(row[4])
+                    except (ValueError, IndexError):
+                        pass
+                    ws.append(row)
+            wb.save(excel_file)
+            
+            self.log_message(f"出闪历史记录已导出到 {excel_file}")
+            if show_message:
+                messagebox.showinfo("成功", f"出闪历史记录已导出到 {excel_file}")
+                
+        except Exception as e:
+            self.log_message(f"导出出闪历史记录失败: {e}")
+            self.logger.error(f"导出出闪历史记录失败: {e}")
+    
     def _get_latest_screenshots(self):
         """获取最新的截图文件路径"""
         try:
@@ -1806,18 +2141,13 @@ class MainGUI:
             if not os.path.exists(screenshots_dir):
                 return []
             
-            # 获取所有截图文件
-            screenshot_files = []
-            for file in os.listdir(screenshots_dir):
-                if file.endswith(('.png', '.jpg', '.jpeg')):
-                    file_path = os.path.join(screenshots_dir, file)
-                    screenshot_files.append(file_path)
-            
-            # 按修改时间排序，获取最新的文件
-            screenshot_files.sort(key=lambda x: os.path.getmtime(x), reverse=True)
+            # 一次遍历获取所有截图文件的(修改时间, 路径)，避免排序时重复stat
+            with os.scandir(screenshots_dir) as it:
+                entries = [(entry.stat().st_mtime, entry.path) for entry in it
+                           if entry.is_file() and entry.name.lower().endswith(('.png', '.jpg', '.jpeg'))]
             
-            # 返回最新的几个文件（最多5个）
-            return screenshot_files[:5]
+            # 只取最新的几个文件（最多5个），无需对全部文件排序
+            return [path for _, path in heapq.nlargest(5, entries)]
             
         except Exception as e:
             self.logger.error(f"获取最新截图失败: {e}")
@@ -1845,18 +2175,7 @@ class MainGUI:
         if not hasattr(self, 'timeline_tree'):
             return
         
-        # 清空现有项目
-        for item in self.timeline_tree.get_children():
-            self.timeline_tree.delete(item)
-        
-        # 添加动作项目
-        for i, action in enumerate(self.timeline_actions):
-            self.timeline_tree.insert('', 'end', values=(
-                i + 1,
-                action['action'],
-                action['delay'],
-                action['description']
-            ))
+        self._repopulate_timeline_tree(self.timeline_tree)
     
     def add_timeline_action(self):
         """添加时间轴动作"""
@@ -1874,7 +2193,7 @@ class MainGUI:
         ttk.Label(main_frame, text="动作类型:").pack(anchor=tk.W, pady=2)
         action_var = tk.StringVar(value="reset")
         action_combo = ttk.Combobox(main_frame, textvariable=action_var, 
-                                   values=['initial_delay', 'reset', 'quick_load', 'confirm', 'analysis', 'custom_delay'],
+                                   values=self._ACTION_TYPES,
                                    state='readonly')
         action_combo.pack(fill=tk.X, pady=2)
         
@@ -1894,7 +2213,7 @@ class MainGUI:
         ttk.Label(main_frame, text="插入位置:").pack(anchor=tk.W, pady=2)
         position_var = tk.StringVar(value="end")
         position_combo = ttk.Combobox(main_frame, textvariable=position_var,
-                                     values=['start', 'end', 'after_selected'],
+                                     values=self._POSITIONS,
                                      state='readonly')
         position_combo.pack(fill=tk.X, pady=2)
         
@@ -1915,17 +2234,7 @@ class MainGUI:
                     'description': description
                 }
                 
-                if position == 'start':
-                    self.timeline_actions.insert(0, new_action)
-                elif position == 'end':
-                    self.timeline_actions.append(new_action)
-                elif position == 'after_selected':
-                    selected = self.timeline_tree.selection()
-                    if selected:
-                        index = self.timeline_tree.index(selected[0])
-                        self.timeline_actions.insert(index + 1, new_action)
-                    else:
-                        self.timeline_actions.append(new_action)
+                self._insert_timeline_action(new_action, position, self.timeline_tree)
                 
                 self.update_timeline_display()
                 dialog.destroy()
@@ -1972,9 +2281,8 @@ class MainGUI:
             # 交换位置
             self.timeline_actions[index], self.timeline_actions[index - 1] = \
                 self.timeline_actions[index - 1], self.timeline_actions[index]
+            # iid跟随动作移动，选中状态无需重新设置
             self.update_timeline_display()
-            # 重新选中移动后的项目
-            self.timeline_tree.selection_set(self.timeline_tree.get_children()[index - 1])
             self.log_message("动作已上移")
     
     def move_timeline_down(self):
@@ -1993,9 +2301,8 @@ class MainGUI:
             # 交换位置
             self.timeline_actions[index], self.timeline_actions[index + 1] = \
                 self.timeline_actions[index + 1], self.timeline_actions[index]
+            # iid跟随动作移动，选中状态无需重新设置
             self.update_timeline_display()
-            # 重新选中移动后的项目
-            self.timeline_tree.selection_set(self.timeline_tree.get_children()[index + 1])
             self.log_message("动作已下移")
     
     def export_timeline_config(self):
@@ -2018,8 +2325,7 @@ class MainGUI:
                     'description': f"时间轴配置 - {len(self.timeline_actions)}个动作, 重试{int(self.retry_count_var.get())}次"
                 }
                 
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    json.dump(config, f, indent=2, ensure_ascii=False)
+                self._dump_json_file(config, file_path)
                 
                 # 保存用户选择的路径
                 self._update_preference("last_export_path", os.path.dirname(file_path))
@@ -2029,6 +2335,37 @@ class MainGUI:
             messagebox.showerror("错误", f"导出时间轴配置失败: {e}")
             self.log_message(f"导出时间轴配置失败: {e}")
     
+    def _validate_timeline_actions(self, timeline_actions):
+        """校验时间轴动作列表，返回第一条错误信息，全部合法时返回None"""
+        required_fields = ('action', 'delay', 'description')
+        
+        def is_valid(action):
+            if not isinstance(action, dict) or not all(field in action for field in required_fields):
+                return False
+            delay = action['delay']
+            if isinstance(delay, (int, float)):
+                return True
+            try:
+                float(delay)
+                return True
+            except (ValueError, TypeError):
+                return False
+        
+        # 快速路径：全部合法时只遍历一次
+        if all(map(is_valid, timeline_actions)):
+            return None
+        
+        # 仅在出错时定位具体问题
+        for i, action in enumerate(timeline_actions):
+            if not isinstance(action, dict):
+                return f"第{i+1}个动作格式错误"
+            for field in required_fields:
+                if field not in action:
+                    return f"第{i+1}个动作缺少{field}字段"
+            if not is_valid(action):
+                return f"第{i+1}个动作的delay必须是数字"
+        return None
+    
     def import_timeline_config(self):
         """导入时间轴配置"""
         try:
@@ -2040,8 +2377,7 @@ class MainGUI:
             )
             
             if file_path:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
+                config = self._load_json_file(file_path)
                 
                 # 验证配置格式
                 if 'timeline_actions' not in config:
@@ -2054,23 +2390,10 @@ class MainGUI:
                     messagebox.showerror("错误", "配置文件格式错误：timeline_actions必须是数组")
                     return
                 
-                for i, action in enumerate(timeline_actions):
-                    if not isinstance(action, dict):
-                        messagebox.showerror("错误", f"配置文件格式错误：第{i+1}个动作格式错误")
-                        return
-                    
-                    required_fields = ['action', 'delay', 'description']
-                    for field in required_fields:
-                        if field not in action:
-                            messagebox.showerror("错误", f"配置文件格式错误：第{i+1}个动作缺少{field}字段")
-                            return
-                    
-                    # 验证delay是数字
-                    try:
-                        float(action['delay'])
-                    except (ValueError, TypeError):
-                        messagebox.showerror("错误", f"配置文件格式错误：第{i+1}个动作的delay必须是数字")
-                        return
+                error = self._validate_timeline_actions(timeline_actions)
+                if error:
+                    messagebox.showerror("错误", f"配置文件格式错误：{error}")
+                    return
                 
                 # 确认导入
                 if messagebox.askyesno("确认导入", f"将导入{len(timeline_actions)}个时间轴动作，是否继续？"):
@@ -2132,8 +2455,7 @@ class MainGUI:
             )
             
             if filepath:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
+                config = self._load_json_file(filepath)
                 
                 # 更新界面显示
                 self.generation_var.set(str(config.get('generation', 6)))
@@ -2155,11 +2477,27 @@ class MainGUI:
         self._update_probability_display()
         self.log_message("概率配置已重置为默认值")
     
+    def _set_if_changed(self, var, value, cache_attr):
+        """仅在值变化时写入Tk变量或标签文本，避免多余的Tcl调用"""
+        if getattr(self, cache_attr, None) != value:
+            if isinstance(var, tk.Variable):
+                var.set(value)
+            else:
+                var.config(text=value)
+            setattr(self, cache_attr, value)
+    
     def _update_threshold_display(self, value=None):
-        """更新阈值显示（保留两位小数）"""
-        self.color_sim_label.config(text=f"{self.color_sim_var.get():.2f}")
-        self.ssim_label.config(text=f"{self.ssim_var.get():.2f}")
-        self.color_diff_label.config(text=f"{self.color_diff_var.get():.2f}")
+        """更新阈值显示（保留两位小数），拖动滑块时合并到一次空闲回调中刷新"""
+        if not self._threshold_update_pending:
+            self._threshold_update_pending = True
+            self.root.after_idle(self._apply_threshold_labels)
+    
+    def _apply_threshold_labels(self):
+        """将三个阈值标签一次性刷新"""
+        self._threshold_update_pending = False
+        self._set_if_changed(self.color_sim_label, f"{self.color_sim_var.get():.2f}", '_color_sim_text')
+        self._set_if_changed(self.ssim_label, f"{self.ssim_var.get():.2f}", '_ssim_text')
+        self._set_if_changed(self.color_diff_label, f"{self.color_diff_var.get():.2f}", '_color_diff_text')
     
     def start_countdown(self, seconds, action):
         """开始倒计时"""
@@ -2167,6 +2505,8 @@ class MainGUI:
         self.countdown_total = seconds
         self.countdown_remaining = seconds
         self.countdown_action = action
+        # 以单调时钟的截止时间为准，避免after调度误差累积
+        self.countdown_end = time.monotonic() + seconds
         self.countdown_progress['maximum'] = seconds
         self.countdown_progress['value'] = 0
         self._update_countdown()
@@ -2176,21 +2516,22 @@ class MainGUI:
         if self.countdown_timer:
             self.root.after_cancel(self.countdown_timer)
             self.countdown_timer = None
-        self.countdown_var.set("等待开始...")
+        self._set_if_changed(self.countdown_var, "等待开始...", '_countdown_text')
         self.countdown_progress['value'] = 0
     
     def _update_countdown(self):
         """更新倒计时显示"""
+        self.countdown_remaining = self.countdown_end - time.monotonic()
         if self.countdown_remaining > 0:
-            # 显示动作描述，精度到小数点后2位
-            self.countdown_var.set(f"{self.countdown_remaining:.2f}秒后: {self.countdown_action}")
-            # 进度条也使用高精度
+            # 显示动作描述，精度到小数点后2位；文本未变化时跳过写入
+            text = f"{self.countdown_remaining:.2f}秒后: {self.countdown_action}"
+            self._set_if_changed(self.countdown_var, text, '_countdown_text')
             progress_value = self.countdown_total - self.countdown_remaining
             self.countdown_progress['value'] = progress_value
-            self.countdown_remaining -= 0.01  # 每10毫秒更新一次，提高精度
-            self.countdown_timer = self.root.after(10, self._update_countdown)  # 10毫秒更新
+            self.countdown_timer = self.root.after(33, self._update_countdown)  # 约30帧/秒刷新
         else:
-            self.countdown_var.set(f"正在执行: {self.countdown_action}")
+            self.countdown_timer = None
+            self._set_if_changed(self.countdown_var, f"正在执行: {self.countdown_action}", '_countdown_text')
             self.countdown_progress['value'] = self.countdown_total
     
     def _setup_input_validation(self):
@@ -2203,37 +2544,79 @@ class MainGUI:
             except ValueError:
                 return False
         
-        # 为重试配置输入框添加验证
-        self.retry_count_var.trace('w', lambda *args: self._validate_input(
-            self.retry_count_var, 0, 5, "重试次数", is_int=True))
-        self.retry_interval_var.trace('w', lambda *args: self._validate_input(
-            self.retry_interval_var, 0.5, 10.0, "重试间隔"))
+        # 为重试配置输入框添加验证（防抖，连续输入只在停顿后校验一次）
+        self.retry_count_var.trace('w', lambda *args: self._debounce(
+            'retry_count', 200, lambda: self._validate_input(
+                self.retry_count_var, 0, 5, "重试次数", is_int=True)))
+        self.retry_interval_var.trace('w', lambda *args: self._debounce(
+            'retry_interval', 200, lambda: self._validate_input(
+                self.retry_interval_var, 0.5, 10.0, "重试间隔")))
+        
+        # 概率计算的输入只在变化时解析一次，读取处直接使用缓存的整数
+        self._cache_int_var(self.generation_var, '_generation_int')
+        self._cache_int_var(self.judgment_count_var, '_judgment_count_int')
+        self._cache_int_var(self.hunt_count_var, '_hunt_count_int')
+    
+    def _debounce(self, key, ms, fn):
+        """防抖：ms毫秒内同一key的重复调用只执行最后一次"""
+        prev = self._debounce_ids.get(key)
+        if prev:
+            self.root.after_cancel(prev)
+        
+        def run():
+            self._debounce_ids.pop(key, None)
+            fn()
+        
+        self._debounce_ids[key] = self.root.after(ms, run)
+    
+    def _cache_int_var(self, var, cache_attr):
+        """在变量写入时解析整数并缓存到cache_attr，无效输入缓存为None"""
+        def parse(*args):
+            try:
+                setattr(self, cache_attr, int(var.get()))
+            except (ValueError, TypeError):
+                setattr(self, cache_attr, None)
+        
+        parse()
+        var.trace('w', parse)
+    
+    def _get_probability_inputs(self):
+        """返回缓存的(世代, 刷闪次数, 判定数)，任一输入无效时抛出ValueError"""
+        inputs = (self._generation_int, self._hunt_count_int, self._judgment_count_int)
+        if None in inputs:
+            raise ValueError("世代、刷闪次数或判定数不是有效整数")
+        return inputs
     
     def _update_probability_display(self, event=None):
         """更新概率显示"""
         try:
-            generation = int(self.generation_var.get())
-            judgment_count = int(self.judgment_count_var.get())
-            hunt_count = int(self.hunt_count_var.get())
+            key = self._get_probability_inputs()
+            generation, hunt_count, judgment_count = key
+            
+            # 输入未变化时无需重新计算
+            if key == self._last_prob_key:
+                return
+            self._last_prob_key = key
             
             # 计算称号和概率
-            title, probability = self.probability_calculator.get_title_by_hunt_count(
+            title, probability = self._title_cache(
                 generation, hunt_count, judgment_count
             )
             
-            # 更新显示
-            self.current_title_var.set(title)
-            self.current_probability_var.set(f"{probability:.2f}%")
-            
             # 检查是否为欧皇中皇
             if self.probability_calculator.is_ultra_lucky(generation, hunt_count, judgment_count):
-                self.current_title_var.set("欧皇中皇")
+                title = "欧皇中皇"
                 self.logger.info(f"检测到欧皇中皇！世代{generation}，刷闪{hunt_count}次，判定数{judgment_count}")
+            
+            # 更新显示
+            self._set_if_changed(self.current_title_var, title, '_title_text')
+            self._set_if_changed(self.current_probability_var, f"{probability:.2f}%", '_probability_text')
                 
         except (ValueError, TypeError) as e:
             self.logger.warning(f"概率计算失败: {e}")
-            self.current_title_var.set("计算错误")
-            self.current_probability_var.set("0.00%")
+            self._last_prob_key = None
+            self._set_if_changed(self.current_title_var, "计算错误", '_title_text')
+            self._set_if_changed(self.current_probability_var, "0.00%", '_probability_text')
     
     def _validate_input(self, var, min_val, max_val, name, is_int=False):
         """验证输入值"""
@@ -2279,15 +2662,10 @@ class MainGUI:
             self.log_message("已清除现有参考图像")
             
             # 1. 导入文件夹下的所有图片作为参考图像
-            image_extensions = ['.png', '.jpg', '.jpeg', '.bmp', '.gif', '.tiff']
-            image_files = []
-            
             # 扫描文件夹下的所有图片文件（不包括子文件夹）
-            for file_name in os.listdir(folder_path):
-                if os.path.isfile(os.path.join(folder_path, file_name)):
-                    file_ext = os.path.splitext(file_name)[1].lower()
-                    if file_ext in image_extensions:
-                        image_files.append(file_name)
+            with os.scandir(folder_path) as it:
+                image_files = [entry.name for entry in it
+                               if entry.is_file() and entry.name.lower().endswith(self._IMG_EXTS)]
             
             if image_files:
                 # 确保configs目录存在
@@ -2295,8 +2673,8 @@ class MainGUI:
                 if not os.path.exists(configs_dir):
                     os.makedirs(configs_dir)
                 
-                imported_count = 0
-                for image_file in image_files:
+                def import_one(image_file):
+                    """读取单张图片并安排复制（在工作线程中执行），失败时返回None"""
                     try:
                         # 构建完整路径
                         source_path = os.path.join(folder_path, image_file)
@@ -2306,16 +2684,36 @@ class MainGUI:
                         ref_image_name = f"{os.path.basename(folder_path)}_{base_name}"
                         ref_image_path = os.path.join(configs_dir, f"{ref_image_name}.png")
                         
-                        # 复制图片文件
-                        shutil.copy2(source_path, ref_image_path)
+                        # 复制图片文件作为独立任务与解码并行（用户文件夹中的原图可能被再次编辑，不使用硬链接）
+                        copy_future = executor.submit(self._copy_file, source_path, ref_image_path)
                         
-                        # 加载参考图像
-                        self.app.image_analyzer.load_reference_image(ref_image_name, ref_image_path)
-                        imported_count += 1
+                        # 直接从源文件解码并预计算比较数据，无需等复制完成后再读取副本
+                        entry = self.app.image_analyzer.read_reference_image(source_path, ref_image_path)
+                        return ref_image_name, entry, copy_future
                         
                     except Exception as e:
                         self.logger.error(f"导入图片失败 {image_file}: {e}")
+                        return None
+                
+                # 复制是IO操作、解码是OpenCV C代码，二者都会释放GIL，用线程池并行处理
+                with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1)) as executor:
+                    imported = list(executor.map(import_one, image_files))
+                
+                # 在主线程中按文件顺序加入参考图像库（复制失败的图片不加入）
+                imported_count = 0
+                for item in imported:
+                    if item is None:
                         continue
+                    ref_image_name, entry, copy_future = item
+                    try:
+                        copy_future.result()
+                    except Exception as e:
+                        self.logger.error(f"复制参考图像失败 {ref_image_name}: {e}")
+                        continue
+                    if entry is None:
+                        continue
+                    self.app.image_analyzer.add_reference_entry(ref_image_name, entry)
+                    imported_count += 1
                 
                 if imported_count > 0:
                     # 更新参考图像列表显示
@@ -2325,8 +2723,7 @@ class MainGUI:
             # 2. 导入截图位置
             screenshot_path = os.path.join(folder_path, "screenshootposition.json")
             if os.path.exists(screenshot_path):
-                with open(screenshot_path, 'r', encoding='utf-8') as f:
-                    screenshot_config = json.load(f)
+                screenshot_config = self._load_json_file(screenshot_path)
                 
                 # 清除现有区域
                 self.app.screenshot_manager.clear_regions()
@@ -2345,8 +2742,7 @@ class MainGUI:
             # 3. 导入时间轴设置
             timeline_path = os.path.join(folder_path, "timeline.json")
             if os.path.exists(timeline_path):
-                with open(timeline_path, 'r', encoding='utf-8') as f:
-                    timeline_config = json.load(f)
+                timeline_config = self._load_json_file(timeline_path)
                 
                 # 加载时间轴配置
                 if 'timeline_actions' in timeline_config:
@@ -2362,8 +2758,7 @@ class MainGUI:
             # 4. 导入暂停信息
             hunt_count_path = os.path.join(folder_path, "hunt_count.json")
             if os.path.exists(hunt_count_path):
-                with open(hunt_count_path, 'r', encoding='utf-8') as f:
-                    hunt_data = json.load(f)
+                hunt_data = self._load_json_file(hunt_count_path)
                 
                 # 加载刷闪次数
                 if 'hunt_count' in hunt_data:
@@ -2376,8 +2771,7 @@ class MainGUI:
             # 5. 导入阈值设置
             threshold_path = os.path.join(folder_path, "threshold.json")
             if os.path.exists(threshold_path):
-                with open(threshold_path, 'r', encoding='utf-8') as f:
-                    threshold_config = json.load(f)
+                threshold_config = self._load_json_file(threshold_path)
                 
                 # 应用阈值设置
                 self.app.image_analyzer.set_color_similarity_threshold(threshold_config.get('color_similarity', 0.8))
@@ -2396,8 +2790,7 @@ class MainGUI:
             # 5. 导入概率配置
             gen_path = os.path.join(folder_path, "gen.json")
             if os.path.exists(gen_path):
-                with open(gen_path, 'r', encoding='utf-8') as f:
-                    gen_config = json.load(f)
+                gen_config = self._load_json_file(gen_path)
                 
                 # 更新概率配置
                 self.generation_var.set(str(gen_config.get('generation', 6)))
@@ -2441,19 +2834,38 @@ class MainGUI:
             self.log_message("清除所有截图区域")
     
     def update_region_list(self):
-        """更新区域列表显示"""
-        # 清空现有项目
-        for item in self.region_tree.get_children():
-            self.region_tree.delete(item)
-        
-        # 添加区域信息
-        for region_info in self.app.screenshot_manager.get_region_list():
-            status = "启用" if region_info['enabled'] else "禁用"
-            self.region_tree.insert('', 'end', values=(
-                region_info['name'],
-                str(region_info['region']),
-                status
-            ))
+        """更新区域列表显示（与上次渲染的行比较，只更新发生变化的行）"""
+        # 先构建全部行
+        rows = [
+            (region_info['name'], str(region_info['region']),
+             "启用" if region_info['enabled'] else "禁用")
+            for region_info in self.app.screenshot_manager.get_region_list()
+        ]
+        
+        rendered = self._region_rows
+        if rendered is None:
+            # 缓存失效：清空现有项目后整体重建
+            self.region_tree.delete(*self.region_tree.get_children())
+            rendered = []
+        
+        try:
+            # 每行使用固定的iid（"r{序号}"），更新已有行、追加新行
+            insert = self.region_tree.insert
+            for i, values in enumerate(rows):
+                if i < len(rendered):
+                    if rendered[i] != values:
+                        self.region_tree.item(f"r{i}", values=values)
+                else:
+                    insert('', 'end', iid=f"r{i}", values=values)
+            
+            # 删除多余的尾部行
+            if len(rendered) > len(rows):
+                self.region_tree.delete(*(f"r{i}" for i in range(len(rows), len(rendered))))
+            
+            self._region_rows = rows
+        except Exception:
+            self._region_rows = None
+            raise
     
     def toggle_region_status(self, event=None):
         """切换区域状态"""
@@ -2637,9 +3049,24 @@ class MainGUI:
     
     def update_reference_list(self):
         """更新参考图像列表"""
-        self.reference_listbox.delete(0, tk.END)
-        for name in self.app.image_analyzer.get_reference_list():
-            self.reference_listbox.insert(tk.END, name)
+        if self._suspend_list_updates:
+            return
+        
+        names = self.app.image_analyzer.get_reference_list()
+        rendered = self._reference_names
+        
+        # 找到第一个不同的位置，只重建其后的部分（追加、删除末尾时不触及前面的行）
+        common = 0
+        for old, new in zip(rendered, names):
+            if old != new:
+                break
+            common += 1
+        
+        if common < len(rendered):
+            self.reference_listbox.delete(common, tk.END)
+        if common < len(names):
+            self.reference_listbox.insert(tk.END, *names[common:])
+        self._reference_names = names
     
     def start_analysis(self):
         """开始分析"""
@@ -2662,7 +3089,8 @@ class MainGUI:
         # 使用多参考图像进行分析
         analysis_results = []
         for result in results:
-            analysis = self.app.image_analyzer.analyze_image_multi_reference(result['image'])
+            # 手动分析需要展示完整的指标，不提前结束
+            analysis = self.app.image_analyzer.analyze_image_multi_reference(result['image'], fast=False)
             analysis['region_name'] = result['name']
             analysis_results.append(analysis)
         
@@ -2679,6 +3107,10 @@ class MainGUI:
         """显示分析结果"""
         self.result_text.delete(1.0, tk.END)
         
+        # 颜色相似度未达阈值时快速拒绝跳过的指标为None，显示为"—"
+        def fmt(value, spec):
+            return "—" if value is None else format(value, spec)
+        
         for result in results:
             region_name = result.get('region_name', '未知区域')
             is_match = result.get('is_match', False)
@@ -2692,10 +3124,10 @@ class MainGUI:
             result_text = f"""
 区域: {region_name}
 状态: {status}
-颜色相似度: {color_sim:.3f}
-结构相似度: {ssim:.3f}
-颜色差异: {color_diff:.1f}
-综合评分: {overall_score:.3f}
+颜色相似度: {fmt(color_sim, '.3f')}
+结构相似度: {fmt(ssim, '.3f')}
+颜色差异: {fmt(color_diff, '.1f')}
+综合评分: {fmt(overall_score, '.3f')}
 {'='*50}
 """
             self.result_text.insert(tk.END, result_text)
@@ -2754,14 +3186,45 @@ class MainGUI:
         timestamp = time.strftime("%H:%M:%S")
         log_entry = f"[{timestamp}] {message}\n"
         
-        self.status_text.insert(tk.END, log_entry)
-        self.status_text.see(tk.END)
+        # 先写入缓冲区，同一轮事件循环内的多条日志在空闲时一次性插入
+        self._log_buffer.append(log_entry)
+        with self._log_flush_lock:
+            schedule = not self._log_flush_pending
+            self._log_flush_pending = True
+        if schedule:
+            self.root.after(0, self._flush_log_buffer)
         
         self.logger.info(message)
     
+    def _flush_log_buffer(self):
+        """将缓冲的日志一次性写入状态文本框，并限制文本框的总行数"""
+        # 先清除标志再取出日志，之后追加的日志会重新调度一次刷新
+        with self._log_flush_lock:
+            self._log_flush_pending = False
+        entries = []
+        while True:
+            try:
+                entries.append(self._log_buffer.popleft())
+            except IndexError:
+                break
+        if not entries:
+            return
+        
+        self.status_text.insert(tk.END, ''.join(entries))
+        
+        # 超过上限时删除最旧的行，避免长时间运行后文本框越来越慢
+        line_count = int(self.status_text.index('end-1c').split('.')[0])
+        if line_count > self._LOG_MAX_LINES:
+            self.status_text.delete('1.0', f'{line_count - self._LOG_KEEP_LINES}.0')
+        
+        self.status_text.see(tk.END)
+    
     def on_closing(self):
         """程序关闭事件"""
         if messagebox.askokcancel("退出", "确定要退出程序吗？"):
             # 停止所有运行中的任务
             self.app.screenshot_manager.stop_scheduled_capture()
+            self.app.screenshot_manager.close()
+            # 退出前将出闪历史同步到Excel
+            self.export_history_excel(show_message=False)
             self.root.destroy()
@@ -6,31 +6,53 @@
 """
 
 import logging
+import os
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List, Tuple, Optional, Dict
 from pathlib import Path
 import json
 
 try:
     import cv2
-    from PIL import Image
-    from skimage.metrics import structural_similarity as ssim
-    from skimage import color
 except ImportError:
-    print("请安装必要的依赖: pip install opencv-python pillow scikit-image")
+    print("请安装必要的依赖: pip install opencv-python")
     cv2 = None
 
+from .analyzer_kernels import multi_ref_color_difference
+
 class ImageAnalyzer:
     """图像分析器"""
     
+    # SSIM的均匀窗口边长（skimage默认值，阈值按此标定）
+    _SSIM_WIN_SIZE = 7
+    
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         self.reference_images = {}  # 存储参考图像
+        self._ref_hist_matrix = None  # 所有参考图像直方图向量组成的(N, 768)矩阵，参考图像变化时失效
+        # 按截图区域尺寸(高, 宽)缓存的参考图像堆叠：(RGB, 灰度, 名称->序号)，参考图像变化时失效
+        self._ref_stacks = {}
+        # 按截图区域尺寸缓存的参考图像LAB堆叠，仅在选择'lab'颜色差异时构建
+        self._ref_lab_stacks = {}
         self.thresholds = {
             'color_similarity': 0.8,  # 颜色相似度阈值
             'ssim_threshold': 0.7,    # 结构相似度阈值
             'color_difference': 30    # 颜色差异阈值
         }
+        # SSIM计算前的缩小倍数（1表示不缩小），仅对大于128x128的图像生效。
+        # 缩小会平均掉位移、噪点等细节，使SSIM偏高，默认阈值按不缩小标定，需要时手动开启
+        self.ssim_downscale = 1
+        # 颜色差异的计算空间：'rgb'为RGB平均绝对差（默认阈值按此设定），
+        # 'lab'为OpenCV 8位LAB空间中逐像素欧氏距离的均方根（更符合感知，
+        # 但L按0-255缩放、a/b偏移128，数值不是标准ΔE单位，需要单独设定阈值）
+        self.color_difference_space = 'rgb'
+        # 是否使用Numba编译的多参考图像颜色差异内核（需安装numba，由设置页的选项开启；
+        # 首次调用需要编译数秒，编译结果缓存到磁盘）
+        self.use_numba_kernels = False
+        # 参考图像数量达到该值时并行比较
+        self.parallel_min_references = 4
+        self._pool = None  # 并行比较用的线程池（首次使用时创建）
         
         if cv2 is None:
             self.logger.error("opencv 未安装，图像分析功能不可用")
@@ -46,31 +68,65 @@ class ImageAnalyzer:
         Returns:
             bool: 加载是否成功
         """
-        if cv2 is None:
+        entry = self.read_reference_image(image_path)
+        if entry is None:
             return False
         
+        self.add_reference_entry(name, entry)
+        return True
+    
+    def read_reference_image(self, image_path: str, stored_path: Optional[str] = None) -> Optional[Dict]:
+        """
+        读取参考图像并预先计算比较所需的数据，不修改参考图像库
+        
+        只读取文件并做OpenCV计算（会释放GIL），可在工作线程中并行调用，
+        结果再通过add_reference_entry在主线程中按顺序加入
+        
+        Args:
+            image_path: 图像文件路径
+            stored_path: 条目中记录的路径（从源文件解码、另行复制到参考图像目录时使用）
+            
+        Returns:
+            参考图像条目，失败时返回None
+        """
+        if cv2 is None:
+            return None
+        
         try:
             # 读取图像
             image = cv2.imread(image_path)
             if image is None:
                 self.logger.error(f"无法读取图像: {image_path}")
-                return False
+                return None
             
             # 转换为RGB格式
             image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
             
-            self.reference_images[name] = {
+            # 参考图像加载后不再变化，预先计算直方图和灰度图供每次比较复用
+            histogram = self.calculate_color_histogram(image_rgb)
+            return {
                 'image': image_rgb,
-                'path': image_path,
-                'histogram': self.calculate_color_histogram(image_rgb)
+                'path': stored_path or image_path,
+                'histogram': histogram,
+                'hist_vector': self._histogram_vector(histogram),
+                'gray': cv2.cvtColor(image_rgb, cv2.COLOR_RGB2GRAY)
             }
             
-            self.logger.info(f"加载参考图像: {name} - {image_path}")
-            return True
-            
         except Exception as e:
             self.logger.error(f"加载参考图像失败: {e}")
-            return False
+            return None
+    
+    def add_reference_entry(self, name: str, entry: Dict):
+        """
+        将read_reference_image得到的条目加入参考图像库
+        
+        Args:
+            name: 参考图像名称
+            entry: 参考图像条目
+        """
+        self.reference_images[name] = entry
+        self._invalidate_reference_caches()
+        self.logger.info(f"加载参考图像: {name} - {entry['path']}")
     
     def calculate_color_histogram(self, image: np.ndarray) -> np.ndarray:
         """
@@ -86,16 +142,14 @@ class ImageAnalyzer:
             return None
         
         try:
-            # 计算RGB三个通道的直方图
-            hist_r = cv2.calcHist([image], [0], None, [256], [0, 256])
-            hist_g = cv2.calcHist([image], [1], None, [256], [0, 256])
-            hist_b = cv2.calcHist([image], [2], None, [256], [0, 256])
-            
-            # 合并直方图
-            histogram = np.concatenate([hist_r, hist_g, hist_b])
+            # 计算RGB三个通道的直方图，直接写入同一个float32数组
+            histogram = np.empty(768, dtype=np.float32)
+            histogram[:256] = np.bincount(image[..., 0].ravel(), minlength=256)
+            histogram[256:512] = np.bincount(image[..., 1].ravel(), minlength=256)
+            histogram[512:] = np.bincount(image[..., 2].ravel(), minlength=256)
             
             # 归一化
-            histogram = histogram / np.sum(histogram)
+            histogram *= 1.0 / histogram.sum()
             
             return histogram
             
@@ -103,13 +157,31 @@ class ImageAnalyzer:
             self.logger.error(f"计算颜色直方图失败: {e}")
             return None
     
-    def compare_color_similarity(self, img1: np.ndarray, img2: np.ndarray) -> float:
+    def _histogram_vector(self, histogram: Optional[np.ndarray]) -> Optional[np.ndarray]:
+        """
+        将直方图去均值并归一化为单位向量
+        
+        两个这样的向量的点积即为直方图的皮尔逊相关系数（与HISTCMP_CORREL一致）
+        """
+        if histogram is None:
+            return None
+        vector = histogram - histogram.mean()
+        norm = float(np.linalg.norm(vector))
+        if norm > 0:
+            vector /= norm
+        return np.ascontiguousarray(vector, dtype=np.float32)
+    
+    def compare_color_similarity(self, img1: np.ndarray, img2: np.ndarray,
+                                 vec1: Optional[np.ndarray] = None,
+                                 vec2: Optional[np.ndarray] = None) -> float:
         """
         比较两个图像的颜色相似度
         
         Args:
             img1: 第一个图像
             img2: 第二个图像
+            vec1: 第一个图像预先计算的直方图向量（_histogram_vector，可选）
+            vec2: 第二个图像预先计算的直方图向量（_histogram_vector，可选）
             
         Returns:
             相似度分数 (0-1)
@@ -118,15 +190,17 @@ class ImageAnalyzer:
             return 0.0
         
         try:
-            # 计算颜色直方图
-            hist1 = self.calculate_color_histogram(img1)
-            hist2 = self.calculate_color_histogram(img2)
+            # 计算直方图向量（已提供时直接复用）
+            if vec1 is None:
+                vec1 = self._histogram_vector(self.calculate_color_histogram(img1))
+            if vec2 is None:
+                vec2 = self._histogram_vector(self.calculate_color_histogram(img2))
             
-            if hist1 is None or hist2 is None:
+            if vec1 is None or vec2 is None:
                 return 0.0
             
-            # 使用巴氏距离计算相似度
-            correlation = cv2.compareHist(hist1, hist2, cv2.HISTCMP_CORREL)
+            # 相关系数：去均值单位向量的点积
+            correlation = float(vec1 @ vec2)
             
             return max(0.0, correlation)
             
@@ -153,11 +227,8 @@ class ImageAnalyzer:
             if img1.shape != img2.shape:
                 img2 = cv2.resize(img2, (img1.shape[1], img1.shape[0]))
             
-            # 计算像素级差异
-            diff = cv2.absdiff(img1, img2)
-            
-            # 计算平均差异
-            mean_diff = np.mean(diff)
+            # 用L1范数在OpenCV内部一次完成差值与求和，不生成中间差异图
+            mean_diff = cv2.norm(img1, img2, cv2.NORM_L1) / float(img1.size)
             
             return mean_diff
             
@@ -165,28 +236,82 @@ class ImageAnalyzer:
             self.logger.error(f"颜色差异计算失败: {e}")
             return float('inf')
     
-    def calculate_structural_similarity(self, img1: np.ndarray, img2: np.ndarray) -> float:
+    def calculate_color_difference_lab(self, lab1: np.ndarray, lab2: np.ndarray) -> float:
+        """
+        计算两个LAB图像的颜色差异（逐像素欧氏距离的均方根）
+        
+        输入为OpenCV的8位LAB（L缩放到0-255，a/b偏移128），
+        因此结果不是标准ΔE单位，L方向的差异约为ΔE的2.55倍
+        
+        Args:
+            lab1: 第一个LAB图像 (uint8)
+            lab2: 第二个LAB图像 (uint8)
+            
+        Returns:
+            颜色差异值
+        """
+        if cv2 is None:
+            return float('inf')
+        
+        try:
+            # 确保图像尺寸相同
+            if lab1.shape != lab2.shape:
+                lab2 = cv2.resize(lab2, (lab1.shape[1], lab1.shape[0]))
+            
+            return cv2.norm(lab1, lab2, cv2.NORM_L2) / np.sqrt(lab1.size / 3)
+            
+        except Exception as e:
+            self.logger.error(f"LAB颜色差异计算失败: {e}")
+            return float('inf')
+    
+    def _color_difference(self, current_image: np.ndarray, reference_image: np.ndarray) -> float:
+        """按color_difference_space选择的颜色空间计算颜色差异"""
+        if self.color_difference_space == 'lab' and cv2 is not None:
+            try:
+                return self.calculate_color_difference_lab(
+                    cv2.cvtColor(current_image, cv2.COLOR_RGB2LAB),
+                    cv2.cvtColor(reference_image, cv2.COLOR_RGB2LAB))
+            except Exception as e:
+                self.logger.error(f"LAB颜色差异计算失败: {e}")
+                return float('inf')
+        return self.calculate_color_difference(current_image, reference_image)
+    
+    def calculate_structural_similarity(self, img1: np.ndarray, img2: np.ndarray,
+                                        gray1: Optional[np.ndarray] = None,
+                                        gray2: Optional[np.ndarray] = None) -> float:
         """
         计算结构相似度 (SSIM)
         
         Args:
             img1: 第一个图像
             img2: 第二个图像
+            gray1: 第一个图像预先转换的灰度图（可选）
+            gray2: 第二个图像预先转换的灰度图（可选）
             
         Returns:
             SSIM分数 (0-1)
         """
         try:
-            # 转换为灰度图像
-            gray1 = cv2.cvtColor(img1, cv2.COLOR_RGB2GRAY)
-            gray2 = cv2.cvtColor(img2, cv2.COLOR_RGB2GRAY)
+            # 转换为灰度图像（已提供时直接复用）
+            if gray1 is None:
+                gray1 = cv2.cvtColor(img1, cv2.COLOR_RGB2GRAY)
+            if gray2 is None:
+                gray2 = cv2.cvtColor(img2, cv2.COLOR_RGB2GRAY)
             
             # 确保图像尺寸相同
             if gray1.shape != gray2.shape:
                 gray2 = cv2.resize(gray2, (gray1.shape[1], gray1.shape[0]))
             
+            # SSIM的开销与像素数成正比，开启缩小时大图先缩小（缩小后仍需容纳SSIM窗口）
+            factor = self.ssim_downscale
+            if (factor > 1 and gray1.shape[0] * gray1.shape[1] > 128 * 128
+                    and min(gray1.shape[:2]) >= self._SSIM_WIN_SIZE * factor):
+                scale = 1.0 / factor
+                gray1 = cv2.resize(gray1, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+                gray2 = cv2.resize(gray2, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            
             # 计算SSIM
-            similarity = ssim(gray1, gray2)
+            similarity = self._ssim_cv2(gray1, gray2)
             
             return max(0.0, similarity)
             
@@ -194,13 +319,60 @@ class ImageAnalyzer:
             self.logger.error(f"结构相似度计算失败: {e}")
             return 0.0
     
-    def analyze_image(self, current_image: np.ndarray, reference_name: str) -> Dict:
+    def _ssim_cv2(self, gray1: np.ndarray, gray2: np.ndarray) -> float:
+        """
+        基于OpenCV均值滤波的SSIM，与skimage.metrics.structural_similarity的默认参数一致
+        （7x7均匀窗口、样本协方差N/(N-1)、去掉3像素边框后取平均），阈值含义不变
+        
+        Args:
+            gray1: 第一个灰度图像 (uint8)
+            gray2: 第二个灰度图像 (uint8)
+            
+        Returns:
+            平均SSIM分数
+        """
+        win_size = self._SSIM_WIN_SIZE
+        if min(gray1.shape[:2]) < win_size:
+            raise ValueError(f"图像尺寸小于SSIM窗口({win_size}x{win_size})")
+        
+        c1 = (0.01 * 255) ** 2
+        c2 = (0.03 * 255) ** 2
+        ksize = (win_size, win_size)
+        cov_norm = win_size * win_size / (win_size * win_size - 1.0)
+        
+        g1 = gray1.astype(np.float64)
+        g2 = gray2.astype(np.float64)
+        
+        def box(image):
+            return cv2.boxFilter(image, cv2.CV_64F, ksize, normalize=True,
+                                 borderType=cv2.BORDER_REFLECT)
+        
+        mu1 = box(g1)
+        mu2 = box(g2)
+        mu1_sq = mu1 * mu1
+        mu2_sq = mu2 * mu2
+        mu1_mu2 = mu1 * mu2
+        
+        sigma1_sq = cov_norm * (box(g1 * g1) - mu1_sq)
+        sigma2_sq = cov_norm * (box(g2 * g2) - mu2_sq)
+        sigma12 = cov_norm * (box(g1 * g2) - mu1_mu2)
+        
+        ssim_map = ((2 * mu1_mu2 + c1) * (2 * sigma12 + c2)) / \
+                   ((mu1_sq + mu2_sq + c1) * (sigma1_sq + sigma2_sq + c2))
+        
+        # 与skimage相同，去掉受边界填充影响的窗口半径宽度的边框
+        pad = (win_size - 1) // 2
+        return float(ssim_map[pad:-pad, pad:-pad].mean())
+    
+    def analyze_image(self, current_image: np.ndarray, reference_name: str, fast_reject: bool = False) -> Dict:
         """
         分析当前图像与参考图像的相似度
         
         Args:
             current_image: 当前图像
             reference_name: 参考图像名称
+            fast_reject: 为True时颜色相似度未达阈值即判定不匹配，
+                         跳过结构相似度和颜色差异的计算（跳过的指标为None）
             
         Returns:
             分析结果字典
@@ -209,22 +381,169 @@ class ImageAnalyzer:
             self.logger.error(f"参考图像不存在: {reference_name}")
             return {}
         
-        reference_image = self.reference_images[reference_name]['image']
+        current_hist, current_gray = self._prepare_current_image(current_image)
+        return self._compare_to_reference(current_image, current_hist, current_gray, reference_name,
+                                          fast_reject=fast_reject)
+    
+    def _prepare_current_image(self, current_image: np.ndarray) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        """计算当前图像的直方图向量和灰度图，供与多个参考图像比较时复用"""
+        if cv2 is None:
+            return None, None
         
-        # 计算各种相似度指标
-        color_similarity = self.compare_color_similarity(current_image, reference_image)
-        color_difference = self.calculate_color_difference(current_image, reference_image)
-        structural_similarity = self.calculate_structural_similarity(current_image, reference_image)
+        try:
+            return (self._histogram_vector(self.calculate_color_histogram(current_image)),
+                    cv2.cvtColor(current_image, cv2.COLOR_RGB2GRAY))
+        except Exception as e:
+            self.logger.error(f"预处理当前图像失败: {e}")
+            return None, None
+    
+    def _invalidate_reference_caches(self):
+        """参考图像库变化后丢弃由其派生的缓存"""
+        self._ref_hist_matrix = None
+        self._ref_stacks = {}
+        self._ref_lab_stacks = {}
+    
+    def _get_ref_stack(self, shape: Tuple[int, ...]) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray, Dict[str, int]]]:
+        """
+        获取缩放到指定尺寸、按参考图像顺序连续存放的RGB和灰度堆叠
         
-        # 综合评分
-        overall_score = (color_similarity + structural_similarity) / 2
+        截图区域尺寸固定，每个尺寸只缩放一次；所有参考图像放在同一块连续内存中，
+        逐个比较时访问模式连续，对缓存更友好
         
-        # 判断是否匹配
-        is_match = (
-            color_similarity >= self.thresholds['color_similarity'] and
-            structural_similarity >= self.thresholds['ssim_threshold'] and
-            color_difference <= self.thresholds['color_difference']
-        )
+        Args:
+            shape: 当前图像的形状
+            
+        Returns:
+            (RGB堆叠 (N,H,W,3), 灰度堆叠 (N,H,W), 名称->序号)，
+            当前图像不是三通道时返回None
+        """
+        if cv2 is None or len(shape) != 3 or shape[2] != 3:
+            return None
+        
+        key = (shape[0], shape[1])
+        stack = self._ref_stacks.get(key)
+        if stack is None:
+            height, width = key
+            count = len(self.reference_images)
+            rgb_stack = np.empty((count, height, width, 3), dtype=np.uint8)
+            gray_stack = np.empty((count, height, width), dtype=np.uint8)
+            index = {}
+            for i, (name, reference) in enumerate(self.reference_images.items()):
+                image, gray = reference['image'], reference['gray']
+                if image.shape[:2] != key:
+                    image = cv2.resize(image, (width, height))
+                    gray = cv2.resize(gray, (width, height))
+                rgb_stack[i] = image
+                gray_stack[i] = gray
+                index[name] = i
+            stack = (rgb_stack, gray_stack, index)
+            self._ref_stacks[key] = stack
+        return stack
+    
+    def _get_ref_lab_stack(self, shape: Tuple[int, ...]) -> Optional[np.ndarray]:
+        """
+        获取缩放到指定尺寸的参考图像LAB堆叠 (N,H,W,3)，由RGB堆叠转换，首次使用时构建
+        
+        Args:
+            shape: 当前图像的形状
+        """
+        stack = self._get_ref_stack(shape)
+        if stack is None:
+            return None
+        
+        key = (shape[0], shape[1])
+        lab_stack = self._ref_lab_stacks.get(key)
+        if lab_stack is None:
+            rgb_stack = stack[0]
+            lab_stack = np.empty_like(rgb_stack)
+            for i in range(len(rgb_stack)):
+                cv2.cvtColor(rgb_stack[i], cv2.COLOR_RGB2LAB, dst=lab_stack[i])
+            self._ref_lab_stacks[key] = lab_stack
+        return lab_stack
+    
+    def _get_reference_for_shape(self, reference_name: str, shape: Tuple[int, ...]) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """
+        获取缩放到指定尺寸的参考图像及其灰度图（堆叠中的视图）
+        
+        Args:
+            reference_name: 参考图像名称
+            shape: 当前图像的形状
+            
+        Returns:
+            (RGB图像, 灰度图)
+        """
+        stack = self._get_ref_stack(shape)
+        if stack is None:
+            reference = self.reference_images[reference_name]
+            return reference['image'], reference.get('gray')
+        rgb_stack, gray_stack, index = stack
+        i = index[reference_name]
+        return rgb_stack[i], gray_stack[i]
+    
+    def _get_pool(self) -> ThreadPoolExecutor:
+        """获取并行比较用的线程池"""
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 1)
+        return self._pool
+    
+    def _get_ref_hist_matrix(self) -> np.ndarray:
+        """按reference_images的顺序堆叠参考图像直方图向量（缺失的用全零行）"""
+        if self._ref_hist_matrix is None:
+            zeros = np.zeros(768, dtype=np.float32)
+            vectors = [ref.get('hist_vector') for ref in self.reference_images.values()]
+            self._ref_hist_matrix = np.stack(
+                [v if v is not None else zeros for v in vectors]).astype(np.float32, copy=False)
+        return self._ref_hist_matrix
+    
+    def _compare_to_reference(self, current_image: np.ndarray, current_hist: Optional[np.ndarray],
+                              current_gray: Optional[np.ndarray], reference_name: str,
+                              color_similarity: Optional[float] = None,
+                              fast_reject: bool = False,
+                              color_difference: Optional[float] = None) -> Dict:
+        """
+        使用预先计算的数据将当前图像与单个参考图像比较
+        
+        Args:
+            current_image: 当前图像
+            current_hist: 当前图像的直方图向量
+            current_gray: 当前图像的灰度图
+            reference_name: 参考图像名称
+            color_similarity: 已批量算好的颜色相似度（可选）
+            fast_reject: 颜色相似度未达阈值时跳过其余指标的计算
+            color_difference: 已批量算好的颜色差异（可选）
+            
+        Returns:
+            分析结果字典
+        """
+        reference = self.reference_images[reference_name]
+        reference_image, reference_gray = self._get_reference_for_shape(reference_name, current_image.shape)
+        
+        # 计算各种相似度指标
+        if color_similarity is None:
+            color_similarity = self.compare_color_similarity(
+                current_image, reference_image, current_hist, reference.get('hist_vector'))
+        if fast_reject and color_similarity < self.thresholds['color_similarity']:
+            # 颜色已不满足，结果必然不匹配，省去开销最大的SSIM；
+            # 跳过的指标记为None，不用占位值冒充真实分数
+            color_difference = None
+            structural_similarity = None
+            overall_score = None
+            is_match = False
+        else:
+            if color_difference is None:
+                color_difference = self._color_difference(current_image, reference_image)
+            structural_similarity = self.calculate_structural_similarity(
+                current_image, reference_image, current_gray, reference_gray)
+            
+            # 综合评分
+            overall_score = (color_similarity + structural_similarity) / 2
+            
+            # 判断是否匹配
+            is_match = (
+                color_similarity >= self.thresholds['color_similarity'] and
+                structural_similarity >= self.thresholds['ssim_threshold'] and
+                color_difference <= self.thresholds['color_difference']
+            )
         
         result = {
             'reference_name': reference_name,
@@ -238,12 +557,14 @@ class ImageAnalyzer:
         
         return result
     
-    def analyze_image_multi_reference(self, current_image: np.ndarray) -> Dict:
+    def analyze_image_multi_reference(self, current_image: np.ndarray, fast: bool = True) -> Dict:
         """
         使用多个参考图像分析当前图像，取各项指标的最大值
         
         Args:
             current_image: 当前图像
+            fast: 为True时，一旦已比较的参考图像的综合指标满足全部阈值就提前结束
+                  （匹配结果不变，但各项指标只统计到已比较的参考图像为止）
             
         Returns:
             分析结果字典（各项指标为所有参考图像中的最大值）
@@ -255,33 +576,130 @@ class ImageAnalyzer:
         # 存储所有参考图像的分析结果
         all_results = []
         
-        # 与每个参考图像进行比较
-        for reference_name in self.reference_images.keys():
-            result = self.analyze_image(current_image, reference_name)
-            if result:  # 确保分析成功
+        # 当前图像的直方图和灰度图只计算一次
+        current_hist, current_gray = self._prepare_current_image(current_image)
+        
+        # 一次矩阵-向量乘法得到与所有参考图像的颜色相似度
+        color_similarities = [None] * len(self.reference_images)
+        if current_hist is not None:
+            try:
+                color_similarities = np.maximum(self._get_ref_hist_matrix() @ current_hist, 0.0).tolist()
+            except Exception as e:
+                self.logger.error(f"批量颜色相似度计算失败: {e}")
+        
+        # 匹配按所有参考图像的最佳指标判断，单个参考图像颜色不达标时其SSIM仍可能有用；
+        # 但若所有参考图像的颜色相似度都不达标，结果必然不匹配，可跳过全部SSIM
+        fast_reject = (fast and None not in color_similarities and
+                       max(color_similarities) < self.thresholds['color_similarity'])
+        
+        # 已比较参考图像的综合指标，用于提前结束
+        best = {'color_similarity': 0.0, 'structural_similarity': 0.0, 'color_difference': float('inf')}
+        
+        def match_decided(result):
+            """更新综合指标；综合指标只会越来越好，满足全部阈值后剩余的参考图像不会改变匹配结果"""
+            if not fast or result['structural_similarity'] is None:
+                return False
+            best['color_similarity'] = max(best['color_similarity'], result['color_similarity'])
+            best['structural_similarity'] = max(best['structural_similarity'], result['structural_similarity'])
+            best['color_difference'] = min(best['color_difference'], result['color_difference'])
+            return (best['color_similarity'] >= self.thresholds['color_similarity'] and
+                    best['structural_similarity'] >= self.thresholds['ssim_threshold'] and
+                    best['color_difference'] <= self.thresholds['color_difference'])
+        
+        # 需要完整比较时，在连续存放的参考图像堆叠上一次算出全部颜色差异
+        # （同时确保堆叠在主线程中构建好，并行比较时只读）
+        color_differences = [None] * len(self.reference_images)
+        stack = None if fast_reject else self._get_ref_stack(current_image.shape)
+        if stack is not None:
+            if self.color_difference_space == 'lab':
+                # 当前图像只转换一次LAB，与缓存的参考图像LAB堆叠比较
+                current_lab = cv2.cvtColor(current_image, cv2.COLOR_RGB2LAB)
+                lab_stack = self._get_ref_lab_stack(current_image.shape)
+                color_differences = [self.calculate_color_difference_lab(current_lab, lab_stack[i])
+                                     for i in range(len(lab_stack))]
+            else:
+                rgb_stack = stack[0]
+                color_differences = None
+                if self.use_numba_kernels and multi_ref_color_difference is not None:
+                    try:
+                        # 编译后的并行内核一次处理整个堆叠（首次调用需要编译，之后复用磁盘缓存）
+                        color_differences = multi_ref_color_difference(
+                            rgb_stack, np.ascontiguousarray(current_image)).tolist()
+                    except Exception as e:
+                        self.logger.error(f"Numba颜色差异内核执行失败，回退到OpenCV: {e}")
+                if color_differences is None:
+                    pixel_count = float(current_image.size)
+                    color_differences = [cv2.norm(current_image, rgb_stack[i], cv2.NORM_L1) / pixel_count
+                                         for i in range(len(rgb_stack))]
+        
+        def compare(task):
+            reference_name, color_similarity, color_difference = task
+            return self._compare_to_reference(current_image, current_hist, current_gray,
+                                              reference_name, color_similarity, fast_reject,
+                                              color_difference)
+        
+        tasks = list(zip(self.reference_images.keys(), color_similarities, color_differences))
+        
+        if fast_reject or len(tasks) < self.parallel_min_references:
+            # 与每个参考图像依次比较
+            for task in tasks:
+                result = compare(task)
+                if not result:  # 确保分析成功
+                    continue
                 all_results.append(result)
+                if match_decided(result):
+                    break
+        else:
+            # 参考图像较多时并行比较（OpenCV计算会释放GIL），结果按参考图像顺序整理
+            futures = {self._get_pool().submit(compare, task): i for i, task in enumerate(tasks)}
+            results_by_index = {}
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    self.logger.error(f"参考图像比较失败: {e}")
+                    continue
+                if not result:  # 确保分析成功
+                    continue
+                results_by_index[futures[future]] = result
+                if match_decided(result):
+                    # 取消尚未开始的比较
+                    for pending in futures:
+                        pending.cancel()
+                    break
+            all_results = [results_by_index[i] for i in sorted(results_by_index)]
         
         if not all_results:
             self.logger.error("所有参考图像分析都失败")
             return {}
         
+        def best_of(key, pick):
+            """取已计算的指标中的最佳值，全部被快速拒绝跳过时为None"""
+            values = [r[key] for r in all_results if r[key] is not None]
+            return pick(values) if values else None
+        
         # 取各项指标的最大值
         max_color_similarity = max(r['color_similarity'] for r in all_results)
-        max_structural_similarity = max(r['structural_similarity'] for r in all_results)
-        max_overall_score = max(r['overall_score'] for r in all_results)
+        max_structural_similarity = best_of('structural_similarity', max)
+        max_overall_score = best_of('overall_score', max)
         
         # 颜色差异取最小值（越小越好）
-        min_color_difference = min(r['color_difference'] for r in all_results)
+        min_color_difference = best_of('color_difference', min)
         
         # 基于综合后的最佳指标进行匹配判断
         is_match = (
+            max_structural_similarity is not None and
             max_color_similarity >= self.thresholds['color_similarity'] and
             max_structural_similarity >= self.thresholds['ssim_threshold'] and
             min_color_difference <= self.thresholds['color_difference']
         )
         
-        # 找到最佳匹配的参考图像
-        best_reference = max(all_results, key=lambda r: r['overall_score'])
+        # 找到最佳匹配的参考图像（没有综合评分时按颜色相似度）
+        if max_overall_score is not None:
+            best_reference = max((r for r in all_results if r['overall_score'] is not None),
+                                 key=lambda r: r['overall_score'])
+        else:
+            best_reference = max(all_results, key=lambda r: r['color_similarity'])
         
         result = {
             'reference_name': f"多参考图像({len(all_results)}个)",
@@ -295,8 +713,9 @@ class ImageAnalyzer:
             'all_results': all_results  # 包含所有参考图像的详细结果
         }
         
+        score_text = f"{max_overall_score:.3f}" if max_overall_score is not None else "—"
         self.logger.info(f"多参考图像分析完成: 最佳匹配={best_reference['reference_name']}, "
-                        f"综合评分={max_overall_score:.3f}, 匹配={is_match}")
+                        f"综合评分={score_text}, 匹配={is_match}")
         
         return result
     
@@ -385,9 +804,11 @@ class ImageAnalyzer:
         """移除参考图像"""
         if name in self.reference_images:
             del self.reference_images[name]
+            self._invalidate_reference_caches()
             self.logger.info(f"移除参考图像: {name}")
     
     def clear_references(self):
         """清除所有参考图像"""
         self.reference_images.clear()
+        self._invalidate_reference_caches()
         self.logger.info("清除所有参考图像")
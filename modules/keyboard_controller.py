@@ -7,49 +7,86 @@
 
 import time
 import logging
-from typing import Optional
+from typing import Optional, Tuple
 import threading
+import queue
 
-try:
-    import pynput
-    from pynput import keyboard
-    from pynput.keyboard import Key, Listener
-except ImportError:
-    print("请安装 pynput: pip install pynput")
-    pynput = None
+from .native_input import create_native_sender
+
+# pynput 在首次创建键盘控制器时才导入（导入时会初始化平台输入绑定）
+pynput = None
+keyboard = None
+Key = None
+
+# 按键名称到pynput按键对象的映射表（导入pynput时构建，按键时直接查表）
+_KEY_MAP = {}
+_MOD_MAP = {}
+
+
+def _import_pynput() -> bool:
+    """
+    延迟导入pynput并构建按键映射表
+    
+    Returns:
+        bool: pynput是否可用
+    """
+    global pynput, keyboard, Key
+    if pynput is not None:
+        return True
+    
+    try:
+        import pynput as _pynput
+        from pynput import keyboard as _keyboard
+        from pynput.keyboard import Key as _Key
+    except ImportError:
+        print("请安装 pynput: pip install pynput")
+        return False
+    
+    _KEY_MAP.update({f'f{i}': getattr(_Key, f'f{i}') for i in range(1, 13)})
+    _MOD_MAP.update({'ctrl': _Key.ctrl, 'alt': _Key.alt, 'shift': _Key.shift})
+    keyboard, Key = _keyboard, _Key
+    pynput = _pynput
+    return True
 
 class KeyboardController:
     """键盘控制器"""
     
+    __slots__ = ('logger', 'keyboard_controller', '_native', '_press_lock', '_combo_cache',
+                 '_press_q', '_press_thread', '_press_thread_lock', 'is_listening',
+                 'custom_keys', '_resolved')
+    
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         self.keyboard_controller = None
+        # Windows下的原生按键发送器，不可用时为None并回退到pynput
+        self._native = None
+        # 按键锁：多个线程共用同一控制器时保证按下/释放成对执行
+        self._press_lock = threading.Lock()
+        # 组合键解析缓存：组合键名称 -> (修饰键对象, 主键对象)
+        self._combo_cache = {}
+        # 异步按键队列，由单个后台线程顺序执行（线程在首次异步按键时才启动）
+        self._press_q = queue.Queue()
+        self._press_thread = None
+        self._press_thread_lock = threading.Lock()
         self.is_listening = False
-        self.hotkeys = {}
         self.custom_keys = {
             'reset': 'ctrl+r',  # 重置键，默认Ctrl+R
             'confirm': 'x',  # 确认键，默认X
             'quick_load': 'f1'  # 快速读取键，默认F1
         }
+        # 动作 -> 已解析的 (主键对象, 修饰键对象)，键位变化时更新
+        self._resolved = {}
         
-        if pynput is None:
+        if not _import_pynput():
             self.logger.error("pynput 未安装，键盘控制功能不可用")
             return
         
-        self.setup_hotkeys()
-    
-    def setup_hotkeys(self):
-        """设置热键"""
-        if pynput is None:
-            return
-            
-        # 定义热键组合
-        self.hotkeys = {
-            'f1_quick_load': Key.f1,
-            'x_confirm': 'x'
-        }
+        # 只创建一次键盘控制器，避免每次按键都重新建立系统绑定
+        self.keyboard_controller = keyboard.Controller()
+        self._native = create_native_sender()
         
-        self.logger.info("热键设置完成")
+        for action in self.custom_keys:
+            self._update_resolved(action)
     
     def set_custom_key(self, action: str, key: str) -> bool:
         """
@@ -64,12 +101,47 @@ class KeyboardController:
         """
         if action in self.custom_keys:
             self.custom_keys[action] = key.lower()
+            self._update_resolved(action)
             self.logger.info(f"设置 {action} 键为: {key}")
             return True
         else:
             self.logger.error(f"不支持的动作: {action}")
             return False
     
+    def _update_resolved(self, action: str):
+        """重新解析动作对应的键位并缓存"""
+        if pynput is None:
+            return
+        spec = self._resolve_key_spec(self.custom_keys[action])
+        if spec is None:
+            self._resolved.pop(action, None)
+        else:
+            self._resolved[action] = spec
+    
+    def _do_action(self, action: str, duration: float = 0.1) -> bool:
+        """
+        按下动作对应的已解析键位
+        
+        Args:
+            action: 动作名称
+            duration: 按键持续时间（秒）
+            
+        Returns:
+            bool: 操作是否成功
+        """
+        spec = self._resolved.get(action)
+        if spec is None:
+            # 未安装pynput或键位无效，走完整路径以输出对应错误
+            return self.press_key(self.get_custom_key(action), duration)
+        
+        try:
+            key_obj, modifier_obj = spec
+            self._press_key_fast(key_obj, duration, modifier_obj)
+            return True
+        except Exception as e:
+            self.logger.error(f"按键操作失败: {e}")
+            return False
+    
     def get_custom_key(self, action: str) -> str:
         """
         获取自定义键位
@@ -82,6 +154,153 @@ class KeyboardController:
         """
         return self.custom_keys.get(action, '')
     
+    def _resolve_key(self, key_lower: str):
+        """
+        将小写按键名称解析为pynput按键对象
+        
+        Args:
+            key_lower: 小写按键名称 ('f1'-'f12' 或单个字母)
+            
+        Returns:
+            按键对象，不支持时返回None
+        """
+        key_obj = _KEY_MAP.get(key_lower)
+        if key_obj is not None:
+            return key_obj
+        if len(key_lower) == 1 and key_lower.isalpha():
+            return key_lower
+        return None
+    
+    def _parse_combo_key(self, combo_key: str) -> Optional[Tuple]:
+        """
+        解析组合键名称
+        
+        Args:
+            combo_key: 组合键名称 ('ctrl+r', 'alt+f4', 等)
+            
+        Returns:
+            (修饰键对象, 主键对象)，不支持时返回None
+        """
+        cached = self._combo_cache.get(combo_key)
+        if cached is not None:
+            return cached
+        
+        parts = combo_key.lower().split('+')
+        if len(parts) != 2:
+            self.logger.error(f"不支持的组合键格式: {combo_key}")
+            return None
+        
+        modifier = parts[0].strip()
+        key = parts[1].strip()
+        
+        # 解析修饰键
+        modifier_obj = _MOD_MAP.get(modifier)
+        if modifier_obj is None:
+            self.logger.error(f"不支持的修饰键: {modifier}")
+            return None
+        
+        # 解析主键
+        key_obj = self._resolve_key(key)
+        if key_obj is None:
+            self.logger.error(f"不支持的按键: {key}")
+            return None
+        
+        parsed = (modifier_obj, key_obj)
+        self._combo_cache[combo_key] = parsed
+        return parsed
+    
+    def _press_key_fast(self, key_obj, duration: float, modifier_obj=None):
+        """
+        使用缓存的控制器按下已解析的按键，不做名称解析和日志
+        
+        Args:
+            key_obj: 已解析的主键对象
+            duration: 按键持续时间（秒）
+            modifier_obj: 已解析的修饰键对象，普通按键为None
+        """
+        native = self._native
+        if native is not None:
+            events = native.prepare(key_obj, modifier_obj)
+            if events is not None:
+                down_events, up_events = events
+                with self._press_lock:
+                    native.send(down_events)
+                    time.sleep(duration)
+                    native.send(up_events)
+                return
+        
+        controller = self.keyboard_controller
+        with self._press_lock:
+            if modifier_obj is not None:
+                controller.press(modifier_obj)
+            controller.press(key_obj)
+            time.sleep(duration)
+            controller.release(key_obj)
+            if modifier_obj is not None:
+                controller.release(modifier_obj)
+    
+    def _resolve_key_spec(self, key: str) -> Optional[Tuple]:
+        """
+        将按键名称（普通键或组合键）解析为 (主键对象, 修饰键对象)
+        
+        Args:
+            key: 按键名称 ('f1', 'x', 'ctrl+r', 等)
+            
+        Returns:
+            (主键对象, 修饰键对象或None)，不支持时返回None
+        """
+        key_lower = key.lower()
+        if '+' in key_lower:
+            parsed = self._parse_combo_key(key_lower)
+            if parsed is None:
+                return None
+            return parsed[1], parsed[0]
+        
+        key_obj = self._resolve_key(key_lower)
+        if key_obj is None:
+            self.logger.error(f"不支持的按键: {key}")
+            return None
+        return key_obj, None
+    
+    def _press_worker(self):
+        """后台按键线程：顺序执行队列中的按键"""
+        while True:
+            key_obj, duration, modifier_obj = self._press_q.get()
+            try:
+                self._press_key_fast(key_obj, duration, modifier_obj)
+            except Exception as e:
+                self.logger.error(f"异步按键操作失败: {e}")
+            finally:
+                self._press_q.task_done()
+    
+    def press_key_async(self, key: str, duration: float = 0.1) -> bool:
+        """
+        非阻塞地按下指定按键，按键在后台线程中依次执行
+        
+        Args:
+            key: 按键名称 ('f1', 'x', 'ctrl+r', 等)
+            duration: 按键持续时间（秒）
+            
+        Returns:
+            bool: 按键是否已成功加入队列
+        """
+        if pynput is None:
+            self.logger.error("pynput 未安装，无法执行按键操作")
+            return False
+        
+        # 在调用方线程解析按键，无效按键立即返回失败
+        resolved = self._resolve_key_spec(key)
+        if resolved is None:
+            return False
+        
+        key_obj, modifier_obj = resolved
+        with self._press_thread_lock:
+            if self._press_thread is None:
+                self._press_thread = threading.Thread(target=self._press_worker, daemon=True)
+                self._press_thread.start()
+        self._press_q.put((key_obj, duration, modifier_obj))
+        return True
+    
     def press_key(self, key: str, duration: float = 0.1) -> bool:
         """
         按下指定按键
@@ -97,56 +316,28 @@ class KeyboardController:
             self.logger.error("pynput 未安装，无法执行按键操作")
             return False
         
+        key_lower = key.lower()
+        
+        # 检查是否是组合键
+        if '+' in key_lower:
+            return self._press_combo_key(key, duration)
+        
+        key_obj = self._resolve_key(key_lower)
+        if key_obj is None:
+            self.logger.error(f"不支持的按键: {key}")
+            return False
+        
+        # 只有实际发送按键的系统调用可能失败
         try:
-            # 检查是否是组合键
-            if '+' in key.lower():
-                return self._press_combo_key(key, duration)
-            
-            key_lower = key.lower()
-            if key_lower == 'f1':
-                key_obj = Key.f1
-            elif key_lower == 'f2':
-                key_obj = Key.f2
-            elif key_lower == 'f3':
-                key_obj = Key.f3
-            elif key_lower == 'f4':
-                key_obj = Key.f4
-            elif key_lower == 'f5':
-                key_obj = Key.f5
-            elif key_lower == 'f6':
-                key_obj = Key.f6
-            elif key_lower == 'f7':
-                key_obj = Key.f7
-            elif key_lower == 'f8':
-                key_obj = Key.f8
-            elif key_lower == 'f9':
-                key_obj = Key.f9
-            elif key_lower == 'f10':
-                key_obj = Key.f10
-            elif key_lower == 'f11':
-                key_obj = Key.f11
-            elif key_lower == 'f12':
-                key_obj = Key.f12
-            elif len(key_lower) == 1 and key_lower.isalpha():
-                key_obj = key_lower
-            else:
-                self.logger.error(f"不支持的按键: {key}")
-                return False
-            
-            # 创建键盘控制器
-            controller = keyboard.Controller()
-            
-            # 按下按键
-            controller.press(key_obj)
-            time.sleep(duration)
-            controller.release(key_obj)
-            
-            self.logger.info(f"按下按键: {key}")
-            return True
-            
+            self._press_key_fast(key_obj, duration)
         except Exception as e:
             self.logger.error(f"按键操作失败: {e}")
             return False
+        
+        # 按键是热路径，只在开启DEBUG时格式化日志
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("按下按键: %s", key)
+        return True
     
     def _press_combo_key(self, combo_key: str, duration: float = 0.1) -> bool:
         """
@@ -159,73 +350,20 @@ class KeyboardController:
         Returns:
             bool: 操作是否成功
         """
+        parsed = self._parse_combo_key(combo_key)
+        if parsed is None:
+            return False
+        
+        modifier_obj, key_obj = parsed
         try:
-            parts = combo_key.lower().split('+')
-            if len(parts) != 2:
-                self.logger.error(f"不支持的组合键格式: {combo_key}")
-                return False
-            
-            modifier = parts[0].strip()
-            key = parts[1].strip()
-            
-            # 解析修饰键
-            if modifier == 'ctrl':
-                modifier_obj = Key.ctrl
-            elif modifier == 'alt':
-                modifier_obj = Key.alt
-            elif modifier == 'shift':
-                modifier_obj = Key.shift
-            else:
-                self.logger.error(f"不支持的修饰键: {modifier}")
-                return False
-            
-            # 解析主键
-            if key == 'f1':
-                key_obj = Key.f1
-            elif key == 'f2':
-                key_obj = Key.f2
-            elif key == 'f3':
-                key_obj = Key.f3
-            elif key == 'f4':
-                key_obj = Key.f4
-            elif key == 'f5':
-                key_obj = Key.f5
-            elif key == 'f6':
-                key_obj = Key.f6
-            elif key == 'f7':
-                key_obj = Key.f7
-            elif key == 'f8':
-                key_obj = Key.f8
-            elif key == 'f9':
-                key_obj = Key.f9
-            elif key == 'f10':
-                key_obj = Key.f10
-            elif key == 'f11':
-                key_obj = Key.f11
-            elif key == 'f12':
-                key_obj = Key.f12
-            elif len(key) == 1 and key.isalpha():
-                key_obj = key
-            else:
-                self.logger.error(f"不支持的按键: {key}")
-                return False
-            
-            # 创建键盘控制器
-            controller = keyboard.Controller()
-            
-            # 按下组合键
-            controller.press(modifier_obj)
-            controller.press(key_obj)
-            time.sleep(duration)
-            controller.release(key_obj)
-            controller.release(modifier_obj)
-            
-            self.logger.info(f"按下组合键: {combo_key}")
-            return True
-            
+            self._press_key_fast(key_obj, duration, modifier_obj)
         except Exception as e:
             self.logger.error(f"组合键操作失败: {e}")
             return False
+        
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("按下组合键: %s", combo_key)
+        return True
     
     def quick_load_save(self) -> bool:
         """
@@ -234,8 +372,7 @@ class KeyboardController:
         Returns:
             bool: 操作是否成功
         """
-        key = self.get_custom_key('quick_load')
-        return self.press_key(key, 0.1)
+        return self._do_action('quick_load')
     
     def confirm_action(self) -> bool:
         """
@@ -244,8 +381,7 @@ class KeyboardController:
         Returns:
             bool: 操作是否成功
         """
-        key = self.get_custom_key('confirm')
-        return self.press_key(key, 0.1)
+        return self._do_action('confirm')
     
     def reset_action(self) -> bool:
         """
@@ -254,8 +390,7 @@ class KeyboardController:
         Returns:
             bool: 操作是否成功
         """
-        key = self.get_custom_key('reset')
-        return self.press_key(key, 0.1)
+        return self._do_action('reset')
     
     def start_hotkey_listener(self, callback_func=None):
         """
@@ -308,13 +443,30 @@ class KeyboardController:
         if intervals is None:
             intervals = [0.1] * len(keys)
         
+        # 先把整个序列解析为按键对象，循环中不再重复解析字符串
+        resolved = []
+        for key in keys:
+            spec = self._resolve_key_spec(key)
+            if spec is None:
+                return False
+            resolved.append(spec)
+        
         try:
-            for i, key in enumerate(keys):
-                if not self.press_key(key, 0.1):
-                    return False
+            # 按绝对时间节拍排程：第 i+1 个按键在第 i 个按下后 (持续时间 + intervals[i]) 开始，
+            # sleep 的误差不会沿序列累积
+            press_duration = 0.1
+            last = len(resolved) - 1
+            deadline = time.perf_counter()
+            for i, (key_obj, modifier_obj) in enumerate(resolved):
+                self._press_key_fast(key_obj, press_duration, modifier_obj)
                 
-                if i < len(intervals) - 1:
-                    time.sleep(intervals[i])
+                if i < last:
+                    deadline += press_duration
+                    if i < len(intervals):
+                        deadline += intervals[i]
+                    slack = deadline - time.perf_counter()
+                    if slack > 0:
+                        time.sleep(slack)
             
             return True
             
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+原生按键注入模块
+在Windows上直接调用 user32.SendInput 发送按键，绕过pynput每次按键的通用ctypes路径
+"""
+
+import sys
+import ctypes
+import logging
+from typing import Optional, Tuple
+
+KEYEVENTF_KEYUP = 0x0002
+INPUT_KEYBOARD = 1
+
+# 修饰键的虚拟键码
+_MODIFIER_VK = {'ctrl': 0x11, 'alt': 0x12, 'shift': 0x10}
+
+if sys.platform == 'win32':
+    from ctypes import wintypes
+    
+    ULONG_PTR = ctypes.c_size_t
+    
+    class MOUSEINPUT(ctypes.Structure):
+        _fields_ = [('dx', wintypes.LONG),
+                    ('dy', wintypes.LONG),
+                    ('mouseData', wintypes.DWORD),
+                    ('dwFlags', wintypes.DWORD),
+                    ('time', wintypes.DWORD),
+                    ('dwExtraInfo', ULONG_PTR)]
+    
+    class KEYBDINPUT(ctypes.Structure):
+        _fields_ = [('wVk', wintypes.WORD),
+                    ('wScan', wintypes.WORD),
+                    ('dwFlags', wintypes.DWORD),
+                    ('time', wintypes.DWORD),
+                    ('dwExtraInfo', ULONG_PTR)]
+    
+    class HARDWAREINPUT(ctypes.Structure):
+        _fields_ = [('uMsg', wintypes.DWORD),
+                    ('wParamL', wintypes.WORD),
+                    ('wParamH', wintypes.WORD)]
+    
+    class _INPUTUNION(ctypes.Union):
+        _fields_ = [('mi', MOUSEINPUT),
+                    ('ki', KEYBDINPUT),
+                    ('hi', HARDWAREINPUT)]
+    
+    class INPUT(ctypes.Structure):
+        _fields_ = [('type', wintypes.DWORD),
+                    ('union', _INPUTUNION)]
+
+
+class NativeKeySender:
+    """基于 SendInput 的按键发送器（仅Windows）"""
+    
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        user32 = ctypes.WinDLL('user32', use_last_error=True)
+        self._send_input = user32.SendInput
+        self._send_input.argtypes = (wintypes.UINT, ctypes.POINTER(INPUT), ctypes.c_int)
+        self._send_input.restype = wintypes.UINT
+        self._map_virtual_key = user32.MapVirtualKeyW
+        self._input_size = ctypes.sizeof(INPUT)
+        # (主键对象, 修饰键对象) -> (按下事件数组, 释放事件数组)，首次使用时构建
+        self._events = {}
+    
+    def _virtual_key(self, key_obj) -> Optional[int]:
+        """将pynput按键对象或单个字母转换为虚拟键码"""
+        if isinstance(key_obj, str):
+            return ord(key_obj.upper()) if len(key_obj) == 1 and key_obj.isalpha() else None
+        name = getattr(key_obj, 'name', None)
+        if name in _MODIFIER_VK:
+            return _MODIFIER_VK[name]
+        return getattr(getattr(key_obj, 'value', None), 'vk', None)
+    
+    def _build(self, vks, flags):
+        """构建一组 INPUT 结构体数组"""
+        events = (INPUT * len(vks))()
+        for event, vk in zip(events, vks):
+            event.type = INPUT_KEYBOARD
+            event.union.ki.wVk = vk
+            event.union.ki.wScan = self._map_virtual_key(vk, 0)
+            event.union.ki.dwFlags = flags
+        return events
+    
+    def prepare(self, key_obj, modifier_obj=None) -> Optional[Tuple]:
+        """
+        获取（必要时构建）按键对应的预构建事件数组
+        
+        Args:
+            key_obj: 主键对象
+            modifier_obj: 修饰键对象，普通按键为None
+        
+        Returns:
+            (按下事件数组, 释放事件数组)，无法映射虚拟键码时返回None
+        """
+        cache_key = (key_obj, modifier_obj)
+        events = self._events.get(cache_key)
+        if events is not None:
+            return events
+        
+        vks = [self._virtual_key(key_obj)]
+        if modifier_obj is not None:
+            vks.insert(0, self._virtual_key(modifier_obj))
+        if None in vks:
+            return None
+        
+        events = (self._build(vks, 0), self._build(vks[::-1], KEYEVENTF_KEYUP))
+        self._events[cache_key] = events
+        return events
+    
+    def send(self, events):
+        """发送一组预构建的按键事件"""
+        count = len(events)
+        if self._send_input(count, events, self._input_size) != count:
+            raise ctypes.WinError(ctypes.get_last_error())
+
+
+def create_native_sender() -> Optional[NativeKeySender]:
+    """
+    创建当前平台可用的原生按键发送器
+    
+    Returns:
+        NativeKeySender，非Windows平台或初始化失败时返回None
+    """
+    if sys.platform != 'win32':
+        return None
+    try:
+        return NativeKeySender()
+    except Exception as e:
+        logging.getLogger(__name__).error(f"初始化原生按键注入失败: {e}")
+        return None
@@ -5,33 +5,80 @@
 负责计算刷闪概率和称号系统
 """
 
-import csv
+import bisect
 import logging
+import math
+import threading
+import numpy as np
 from typing import Dict, List, Tuple, Optional
 
 class ProbabilityCalculator:
     """概率计算器"""
     
+    __slots__ = ('logger', 'generation_probabilities', '_sorted_titles',
+                 '_title_thresholds', '_title_arrays', '_log1p_cache')
+    
+    # 进程内共享的已解析配置数据，只在首次实例化时读取CSV
+    _shared_data = None
+    _shared_lock = threading.Lock()
+    
+    # 欧皇中皇判定：累积概率 < 0.1% 等价于 n * log1p(-p) > log(0.999)
+    _LOG_0_999 = math.log(0.999)
+    
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         self.generation_probabilities = {}  # 世代概率表
-        self.titles = {}  # 称号表
-        self.load_probability_data()
-        self.load_title_data()
+        self._sorted_titles = []  # 称号表，按概率阈值升序排列的 (阈值, 称号)
+        self._title_thresholds = []  # 与 _sorted_titles 对应的阈值列表，用于二分查找
+        self._title_arrays = None  # (阈值数组, 称号数组)，用于批量查询
+        self._log1p_cache = {}  # (世代, 判定数) -> log1p(-单次概率)
+        self._ensure_loaded()
+    
+    def _ensure_loaded(self):
+        """从类级缓存获取概率/称号数据，首次调用时才读取CSV"""
+        cls = type(self)
+        with cls._shared_lock:
+            if cls._shared_data is None:
+                self.load_probability_data()
+                self.load_title_data()
+                cls._shared_data = (self.generation_probabilities,
+                                    self._sorted_titles,
+                                    self._title_thresholds,
+                                    self._title_arrays)
+                return
+        
+        # 共享数据加载后只读，各实例直接引用同一份
+        (self.generation_probabilities,
+         self._sorted_titles,
+         self._title_thresholds,
+         self._title_arrays) = cls._shared_data
+    
+    def _iter_csv_pairs(self, csv_path: str):
+        """
+        逐行产出两列CSV的前两列（跳过标题行和空字段）
+        
+        配置CSV都是无引号的小文件，一次读入后按行切分即可，不需要csv模块
+        
+        Args:
+            csv_path: CSV文件路径
+        """
+        with open(csv_path, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        
+        for line in lines[1:]:  # 跳过标题行
+            first, _, rest = line.partition(',')
+            second = rest.split(',', 1)[0]
+            if first and second:
+                yield first, second
     
     def load_probability_data(self):
         """加载概率数据"""
+        self._log1p_cache.clear()
         try:
-            with open('configs/概率.csv', 'r', encoding='utf-8') as f:
-                reader = csv.reader(f)
-                next(reader)  # 跳过标题行
-                
-                for row in reader:
-                    if len(row) >= 2 and row[0] and row[1]:
-                        generation = int(row[0])
-                        denominator = int(row[1])
-                        self.generation_probabilities[generation] = denominator
-                        
+            self.generation_probabilities = {
+                int(generation): int(denominator)
+                for generation, denominator in self._iter_csv_pairs('configs/概率.csv')
+            }
             self.logger.info(f"加载了 {len(self.generation_probabilities)} 个世代的概率数据")
         except Exception as e:
             self.logger.error(f"加载概率数据失败: {e}")
@@ -43,25 +90,26 @@ class ProbabilityCalculator:
     def load_title_data(self):
         """加载称号数据"""
         try:
-            with open('configs/称号.csv', 'r', encoding='utf-8') as f:
-                reader = csv.reader(f)
-                next(reader)  # 跳过标题行
-                
-                for row in reader:
-                    if len(row) >= 2 and row[0] and row[1]:
-                        title = row[0]
-                        probability = float(row[1])
-                        self.titles[probability] = title
-                        
-            self.logger.info(f"加载了 {len(self.titles)} 个称号")
+            # 称号表只在加载时排序一次，查询时直接二分
+            self._sorted_titles = sorted(
+                (float(probability), title)
+                for title, probability in self._iter_csv_pairs('configs/称号.csv')
+            )
+            self.logger.info(f"加载了 {len(self._sorted_titles)} 个称号")
         except Exception as e:
             self.logger.error(f"加载称号数据失败: {e}")
             # 默认数据
-            self.titles = {
-                0.1: "欧皇中皇", 1: "欧皇", 5: "非同一般欧洲狗",
-                10: "不可小觑欧洲人", 20: "欧洲人", 50: "平平无奇",
-                70: "小非酋", 80: "非洲酋长", 90: "月见黑", 99: "大阴阳师"
-            }
+            self._sorted_titles = [
+                (0.1, "欧皇中皇"), (1, "欧皇"), (5, "非同一般欧洲狗"),
+                (10, "不可小觑欧洲人"), (20, "欧洲人"), (50, "平平无奇"),
+                (70, "小非酋"), (80, "非洲酋长"), (90, "月见黑"), (99, "大阴阳师")
+            ]
+        
+        self._title_thresholds = [prob for prob, _ in self._sorted_titles]
+        self._title_arrays = (
+            np.array(self._title_thresholds, dtype=np.float64),
+            np.array([title for _, title in self._sorted_titles], dtype=object)
+        )
     
     def get_available_generations(self) -> List[int]:
         """获取可用的世代列表"""
@@ -98,9 +146,64 @@ class ProbabilityCalculator:
         Returns:
             累积出闪概率（百分比）
         """
+        log_miss = self._get_log1p_neg_p(generation, judgment_count)
+        if log_miss is None:
+            return 100.0 if hunt_count > 0 else 0.0
+        
+        # 1 - (1 - p)^n = -expm1(n * log1p(-p))，p 极小时仍保持精度
+        return -math.expm1(hunt_count * log_miss) * 100
+    
+    def _get_log1p_neg_p(self, generation: int, judgment_count: int) -> Optional[float]:
+        """
+        获取 log1p(-单次概率)，按 (世代, 判定数) 缓存
+        
+        Args:
+            generation: 世代
+            judgment_count: 判定数（分子）
+            
+        Returns:
+            log1p(-p)；单次概率不小于1时返回None
+        """
+        key = (generation, judgment_count)
+        log_miss = self._log1p_cache.get(key)
+        if log_miss is not None:
+            return log_miss
+        
+        denominator = self.generation_probabilities.get(generation)
+        if denominator is None:
+            self.logger.error(f"未知的世代: {generation}")
+            single_prob = 0.0
+        else:
+            single_prob = judgment_count / denominator
+        if single_prob >= 1:
+            return None
+        
+        log_miss = math.log1p(-single_prob)
+        self._log1p_cache[key] = log_miss
+        return log_miss
+    
+    def calculate_cumulative_probability_array(self, generation: int, hunt_counts,
+                                               judgment_count: int = 1) -> np.ndarray:
+        """
+        批量计算累积出闪概率曲线（向量化）
+        
+        Args:
+            generation: 世代
+            hunt_counts: 刷闪次数数组，如 np.arange(n)
+            judgment_count: 判定数（分子）
+            
+        Returns:
+            与 hunt_counts 等长的累积概率数组（百分比）
+        """
+        hunt_counts = np.asarray(hunt_counts, dtype=np.float64)
         single_prob = self.calculate_single_probability(generation, judgment_count) / 100
-        cumulative_prob = 1 - (1 - single_prob) ** hunt_count
-        return cumulative_prob * 100
+        if single_prob <= 0:
+            return np.zeros_like(hunt_counts)
+        if single_prob >= 1:
+            return np.where(hunt_counts > 0, 100.0, 0.0)
+        
+        # 1 - (1 - p)^n 改写为 -expm1(n * log1p(-p))，p 极小时仍保持精度
+        return -np.expm1(hunt_counts * np.log1p(-single_prob)) * 100
     
     def get_title_by_probability(self, probability: float) -> str:
         """
@@ -112,15 +215,23 @@ class ProbabilityCalculator:
         Returns:
             称号名称
         """
-        # 按概率从低到高排序
-        sorted_titles = sorted(self.titles.items())
-        
-        for prob_threshold, title in sorted_titles:
-            if probability <= prob_threshold:
-                return title
+        # 找到第一个不小于该概率的阈值；超过最高阈值时返回最高称号
+        index = bisect.bisect_left(self._title_thresholds, probability)
+        return self._sorted_titles[min(index, len(self._sorted_titles) - 1)][1]
+    
+    def get_titles_batch(self, probabilities) -> np.ndarray:
+        """
+        批量根据概率获取称号（向量化）
         
-        # 如果概率超过最高阈值，返回最高称号
-        return sorted_titles[-1][1]
+        Args:
+            probabilities: 概率数组（百分比）
+            
+        Returns:
+            与输入等长的称号数组
+        """
+        thresholds, titles = self._title_arrays
+        indices = np.searchsorted(thresholds, np.asarray(probabilities, dtype=np.float64), side='left')
+        return titles[np.minimum(indices, len(thresholds) - 1)]
     
     def get_title_by_hunt_count(self, generation: int, hunt_count: int, judgment_count: int = 1) -> Tuple[str, float]:
         """
@@ -150,5 +261,7 @@ class ProbabilityCalculator:
         Returns:
             是否为欧皇中皇
         """
-        cumulative_prob = self.calculate_cumulative_probability(generation, hunt_count, judgment_count)
-        return cumulative_prob < 0.1
+        log_miss = self._get_log1p_neg_p(generation, judgment_count)
+        if log_miss is None:
+            return hunt_count <= 0
+        return hunt_count * log_miss > self._LOG_0_999
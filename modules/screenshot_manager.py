@@ -8,25 +8,39 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import logging
+import os
 from typing import List, Tuple, Optional, Dict
 from PIL import Image, ImageTk
 import numpy as np
 import threading
+import queue
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import json
 
 try:
     import mss
-    import cv2
 except ImportError:
-    print("请安装必要的依赖: pip install mss opencv-python pillow")
+    print("请安装必要的依赖: pip install mss pillow")
     mss = None
+
+# OpenCV 仅用于加速区域截图的PNG编码，不可用时使用Pillow
+try:
+    import cv2
+except ImportError:
     cv2 = None
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 class FullScreenRegionSelector:
     """基于完整屏幕截图的区域选择器"""
     
+    _REGION_COLORS = ('red', 'blue', 'green', 'orange', 'purple', 'brown', 'pink', 'gray')
+    
     def __init__(self, parent, callback=None):
         self.parent = parent
         self.callback = callback
@@ -39,6 +53,20 @@ class FullScreenRegionSelector:
         self.current_region = None
         self.regions = []  # 存储所有选择的区域
         self.region_counter = 1
+        self._sct = None  # 复用的MSS实例（选择器只在GUI线程使用）
+        
+        # 画布项：截图图像项，以及与 regions 一一对应的 (矩形项, 文字项)
+        self._image_item = None
+        self._region_items = []
+        self._sel_id = None  # 当前拖拽选择框（持久的矩形项，拖拽时只更新坐标）
+        
+        # 预览PhotoImage双缓冲：向未显示的一个粘贴新内容后再切换
+        self._photos = [None, None]
+        self._active_photo = 0
+        
+        # 上次预览的源图像与尺寸、上次窗口尺寸，用于跳过无变化的刷新
+        self._display_key = None
+        self._last_geom = None
         
         # 先截取完整屏幕，再创建界面
         self.capture_full_screen_first()
@@ -126,6 +154,31 @@ class FullScreenRegionSelector:
         # 绑定双击删除事件
         self.region_listbox.bind('<Double-1>', self.delete_selected_region)
     
+    def _get_sct(self):
+        """获取（必要时创建）复用的MSS实例"""
+        if self._sct is None:
+            self._sct = mss.mss()
+        return self._sct
+    
+    def _close_sct(self):
+        """关闭复用的MSS实例"""
+        if self._sct is not None:
+            try:
+                self._sct.close()
+            except Exception:
+                pass
+            self._sct = None
+    
+    def _screenshot_to_image(self, screenshot) -> Image.Image:
+        """
+        将MSS截图转换为PIL RGB图像
+        
+        直接把BGRA缓冲区视为numpy数组，一次向量化拷贝完成通道重排
+        """
+        raw = np.frombuffer(screenshot.raw, dtype=np.uint8).reshape(screenshot.height, screenshot.width, 4)
+        rgb = np.ascontiguousarray(raw[..., 2::-1])
+        return Image.fromarray(rgb, 'RGB')
+    
     def capture_full_screen_first(self):
         """先截取完整屏幕，再创建界面"""
         if mss is None:
@@ -133,23 +186,23 @@ class FullScreenRegionSelector:
             return
         
         try:
-            with mss.mss() as sct:
-                # 获取主显示器
-                monitor = sct.monitors[1]  # 主显示器
-                screenshot = sct.grab(monitor)
-                
-                # 转换为PIL图像
-                self.original_image = Image.frombytes("RGB", screenshot.size, screenshot.bgra, "raw", "BGRX")
-                self.original_size = self.original_image.size
-                
-                self.logger.info("完整屏幕截图成功")
-                
-                # 截图完成后创建界面
-                self.create_selector_window()
-                
-                # 延迟显示图像，确保窗口完全创建
-                self.selector_window.after(100, self.display_captured_image)
-                
+            sct = self._get_sct()
+            # 获取主显示器
+            monitor = sct.monitors[1]  # 主显示器
+            screenshot = sct.grab(monitor)
+            
+            # 转换为PIL图像
+            self.original_image = self._screenshot_to_image(screenshot)
+            self.original_size = self.original_image.size
+            
+            self.logger.info("完整屏幕截图成功")
+            
+            # 截图完成后创建界面
+            self.create_selector_window()
+            
+            # 延迟显示图像，确保窗口完全创建
+            self.selector_window.after(100, self.display_captured_image)
+            
         except Exception as e:
             self.logger.error(f"截图失败: {e}")
             messagebox.showerror("错误", f"截图失败: {e}")
@@ -166,20 +219,20 @@ class FullScreenRegionSelector:
             return
         
         try:
-            with mss.mss() as sct:
-                # 获取主显示器
-                monitor = sct.monitors[1]  # 主显示器
-                screenshot = sct.grab(monitor)
-                
-                # 转换为PIL图像
-                self.original_image = Image.frombytes("RGB", screenshot.size, screenshot.bgra, "raw", "BGRX")
-                self.original_size = self.original_image.size
-                
-                self.logger.info("重新截图成功")
-                
-                # 重新显示图像
-                self.display_image(self.original_image)
-                
+            sct = self._get_sct()
+            # 获取主显示器
+            monitor = sct.monitors[1]  # 主显示器
+            screenshot = sct.grab(monitor)
+            
+            # 转换为PIL图像
+            self.original_image = self._screenshot_to_image(screenshot)
+            self.original_size = self.original_image.size
+            
+            self.logger.info("重新截图成功")
+            
+            # 重新显示图像
+            self.display_image(self.original_image)
+            
         except Exception as e:
             self.logger.error(f"重新截图失败: {e}")
             messagebox.showerror("错误", f"重新截图失败: {e}")
@@ -191,19 +244,19 @@ class FullScreenRegionSelector:
             return
         
         try:
-            with mss.mss() as sct:
-                # 获取主显示器
-                monitor = sct.monitors[1]  # 主显示器
-                screenshot = sct.grab(monitor)
-                
-                # 转换为PIL图像
-                img = Image.frombytes("RGB", screenshot.size, screenshot.bgra, "raw", "BGRX")
-                
-                # 调整图像大小以适应窗口
-                self.display_image(img)
-                
-                self.logger.info("完整屏幕截图成功")
-                
+            sct = self._get_sct()
+            # 获取主显示器
+            monitor = sct.monitors[1]  # 主显示器
+            screenshot = sct.grab(monitor)
+            
+            # 转换为PIL图像
+            img = self._screenshot_to_image(screenshot)
+            
+            # 调整图像大小以适应窗口
+            self.display_image(img)
+            
+            self.logger.info("完整屏幕截图成功")
+            
         except Exception as e:
             self.logger.error(f"截图失败: {e}")
             messagebox.showerror("错误", f"截图失败: {e}")
@@ -233,20 +286,46 @@ class FullScreenRegionSelector:
         # 缩放图像
         new_width = int(img_width * self.scale)
         new_height = int(img_height * self.scale)
-        self.display_img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
         
-        # 转换为PhotoImage
-        self.photo = ImageTk.PhotoImage(self.display_img)
-        
-        # 清除画布并显示图像
-        self.canvas.delete("all")
-        self.canvas.create_image(0, 0, anchor=tk.NW, image=self.photo)
+        # 同一张图像、同一预览尺寸时已显示的内容无需重新缩放
+        display_key = (img, new_width, new_height)
+        if self._display_key is not None and self._display_key[0] is img \
+                and self._display_key[1:] == display_key[1:]:
+            return
+        self._display_key = display_key
+        if self.scale < 1:
+            # 缩小预览：reducing_gap 让Pillow先做整数倍盒式缩减，再对小图双三次插值
+            # （与 thumbnail 相同的快速路径，但不需要先复制整张截图）
+            self.display_img = img.resize((new_width, new_height), Image.Resampling.BICUBIC,
+                                          reducing_gap=2.0)
+        else:
+            self.display_img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+        
+        # 转换为PhotoImage：尺寸不变时直接粘贴到备用缓冲区，避免重建Tk图像资源
+        index = 1 - self._active_photo
+        photo = self._photos[index]
+        if photo is None or (photo.width(), photo.height()) != self.display_img.size:
+            photo = ImageTk.PhotoImage(self.display_img)
+            self._photos[index] = photo
+        else:
+            photo.paste(self.display_img)
+        self._active_photo = index
+        self.photo = photo
+        
+        # 更新画布上的图像（复用图像项，区域框保留并在下方按新比例移动）
+        self.canvas.delete("current_selection")
+        self._sel_id = None
+        if self._image_item is None:
+            self._image_item = self.canvas.create_image(0, 0, anchor=tk.NW, image=self.photo)
+            self.canvas.tag_lower(self._image_item)
+        else:
+            self.canvas.itemconfig(self._image_item, image=self.photo)
         
         # 设置画布尺寸以匹配图像
         self.canvas.configure(width=new_width, height=new_height)
         
         # 更新滚动区域
-        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+        self.canvas.configure(scrollregion=self.canvas.bbox(self._image_item))
         
         # 保存原始图像用于后续截图
         self.original_image = img
@@ -259,6 +338,12 @@ class FullScreenRegionSelector:
         """窗口大小变化事件处理"""
         # 只有当窗口大小真正改变时才重新显示图像
         if event.widget == self.selector_window and hasattr(self, 'original_image'):
+            # 窗口尺寸未变（如仅移动窗口）时不重新安排刷新
+            geom = (event.width, event.height)
+            if geom == self._last_geom:
+                return
+            self._last_geom = geom
+            
             # 延迟重新显示，避免频繁更新
             if hasattr(self, '_resize_timer') and self._resize_timer is not None:
                 try:
@@ -322,9 +407,6 @@ class FullScreenRegionSelector:
     
     def draw_current_selection(self):
         """绘制当前选择区域"""
-        # 清除当前选择框
-        self.canvas.delete("current_selection")
-        
         if self.start_point and self.end_point:
             x1, y1 = self.start_point
             x2, y2 = self.end_point
@@ -333,11 +415,14 @@ class FullScreenRegionSelector:
             x1, x2 = min(x1, x2), max(x1, x2)
             y1, y2 = min(y1, y2), max(y1, y2)
             
-            # 绘制选择框
-            self.canvas.create_rectangle(
-                x1, y1, x2, y2,
-                outline='red', width=2, tags="current_selection"
-            )
+            # 已有选择框时只移动坐标，避免每次鼠标移动都删除并重建画布项
+            if self._sel_id is not None:
+                self.canvas.coords(self._sel_id, x1, y1, x2, y2)
+            else:
+                self._sel_id = self.canvas.create_rectangle(
+                    x1, y1, x2, y2,
+                    outline='red', width=2, tags="current_selection"
+                )
     
     def add_region(self, region: Tuple[int, int, int, int]):
         """添加区域到列表"""
@@ -358,21 +443,26 @@ class FullScreenRegionSelector:
     
     def update_region_list(self):
         """更新区域列表显示"""
+        items = [
+            f"{'✓' if region_info['enabled'] else '✗'} {region_info['name']}: {region_info['region']}"
+            for region_info in self.regions
+        ]
+        # 一次删除、一次批量插入，各只需一次Tcl调用
         self.region_listbox.delete(0, tk.END)
-        for region_info in self.regions:
-            status = "✓" if region_info['enabled'] else "✗"
-            self.region_listbox.insert(tk.END, f"{status} {region_info['name']}: {region_info['region']}")
+        if items:
+            self.region_listbox.insert(tk.END, *items)
     
     def draw_all_regions(self):
-        """绘制所有已选择的区域"""
-        # 清除所有区域框
-        self.canvas.delete("region_box")
+        """绘制所有已选择的区域（已有的区域框只移动坐标，只为新增区域创建画布项）"""
+        colors = self._REGION_COLORS
+        items = self._region_items
         
-        colors = ['red', 'blue', 'green', 'orange', 'purple', 'brown', 'pink', 'gray']
+        # 删除多余的画布项
+        while len(items) > len(self.regions):
+            self.canvas.delete(*items.pop())
         
         for i, region_info in enumerate(self.regions):
             region = region_info['region']
-            color = colors[i % len(colors)]
             
             # 转换为显示坐标
             x1 = region[0] * self.scale
@@ -380,17 +470,26 @@ class FullScreenRegionSelector:
             x2 = region[2] * self.scale
             y2 = region[3] * self.scale
             
+            if i < len(items):
+                rect_id, text_id = items[i]
+                self.canvas.coords(rect_id, x1, y1, x2, y2)
+                self.canvas.coords(text_id, x1, y1-10)
+                continue
+            
+            color = colors[i % len(colors)]
+            
             # 绘制区域框
-            self.canvas.create_rectangle(
+            rect_id = self.canvas.create_rectangle(
                 x1, y1, x2, y2,
                 outline=color, width=2, tags="region_box"
             )
             
             # 绘制区域标签
-            self.canvas.create_text(
+            text_id = self.canvas.create_text(
                 x1, y1-10, text=region_info['name'],
                 fill=color, tags="region_box", anchor=tk.W
             )
+            items.append((rect_id, text_id))
     
     def delete_selected_region(self, event):
         """删除选中的区域"""
@@ -398,6 +497,14 @@ class FullScreenRegionSelector:
         if selection:
             index = selection[0]
             region_info = self.regions.pop(index)
+            self.canvas.delete(*self._region_items.pop(index))
+            # 后续区域的序号前移，颜色随序号更新
+            colors = self._REGION_COLORS
+            for i in range(index, len(self._region_items)):
+                rect_id, text_id = self._region_items[i]
+                color = colors[i % len(colors)]
+                self.canvas.itemconfig(rect_id, outline=color)
+                self.canvas.itemconfig(text_id, fill=color)
             self.update_region_list()
             self.draw_all_regions()
             self.logger.info(f"删除区域: {region_info['name']}")
@@ -406,6 +513,8 @@ class FullScreenRegionSelector:
         """清除所有区域"""
         self.regions.clear()
         self.region_counter = 1
+        self.canvas.delete("region_box")
+        self._region_items.clear()
         self.update_region_list()
         self.draw_all_regions()
         self.logger.info("清除所有区域")
@@ -419,10 +528,12 @@ class FullScreenRegionSelector:
         if self.callback:
             self.callback(self.regions.copy())
         
+        self._close_sct()
         self.selector_window.destroy()
     
     def cancel_selection(self):
         """取消选择"""
+        self._close_sct()
         self.selector_window.destroy()
 
 class ScreenshotManager:
@@ -433,7 +544,23 @@ class ScreenshotManager:
         self.screenshot_regions = []  # 存储截图区域
         self.is_capturing = False
         self.capture_thread = None
-        self.shiny_images = set()  # 存储闪光图片路径
+        self.shiny_images = set()  # 存储闪光图片的文件标识 (st_dev, st_ino)
+        
+        # MSS实例按线程复用（MSS句柄不能跨线程使用），记录所有实例以便关闭
+        self._sct_local = threading.local()
+        self._sct_instances = []
+        self._sct_lock = threading.Lock()
+        
+        # 区域截图的PNG编码在后台写盘线程中完成，不占用截图线程
+        self._save_queue = queue.Queue(maxsize=64)
+        # 区域名 -> (上一帧图像, 已保存路径)，画面未变化时不再重复保存
+        self._last_frames = {}
+        # 挂机线程、定时截图线程和GUI线程都可能同时截图，
+        # 与上一帧的比较和缓存更新必须串行执行
+        self._frame_lock = threading.Lock()
+        # 批量保存截图用的线程池（PNG编码和写盘会释放GIL），首次使用时创建
+        self._io_pool = None
+        threading.Thread(target=self._save_worker, daemon=True).start()
         
         # 创建截图目录
         self.screenshot_dir = Path("screenshots")
@@ -466,6 +593,81 @@ class ScreenshotManager:
         self.screenshot_regions.append(region_info)
         self.logger.info(f"添加区域: {name} ({x1}, {y1}, {x2}, {y2})")
     
+    def _get_sct(self):
+        """获取当前线程复用的MSS实例，首次调用时创建"""
+        sct = getattr(self._sct_local, 'sct', None)
+        if sct is None:
+            sct = mss.mss()
+            self._sct_local.sct = sct
+            with self._sct_lock:
+                self._sct_instances.append(sct)
+        return sct
+    
+    def release_thread_resources(self):
+        """
+        关闭当前线程创建的MSS实例
+        
+        截图线程（挂机线程、定时截图线程）退出前调用，避免每个线程各留下一个
+        未关闭的实例（Windows上每个实例都占用DC和位图等GDI句柄）
+        """
+        sct = getattr(self._sct_local, 'sct', None)
+        self._sct_local.sct = None
+        self._sct_local.bounds = None
+        if sct is None:
+            return
+        
+        with self._sct_lock:
+            if sct in self._sct_instances:
+                self._sct_instances.remove(sct)
+        try:
+            sct.close()
+        except Exception as e:
+            self.logger.error(f"关闭MSS实例失败: {e}")
+    
+    def _get_io_pool(self) -> ThreadPoolExecutor:
+        """获取批量保存用的线程池"""
+        if self._io_pool is None:
+            self._io_pool = ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1))
+        return self._io_pool
+    
+    def close(self):
+        """等待排队的区域图像写盘完成，并关闭所有线程创建的MSS实例和保存线程池"""
+        # 写盘线程是守护线程，退出前不等待会丢失队列中尚未保存的图像
+        self.flush_pending_saves()
+        
+        if self._io_pool is not None:
+            self._io_pool.shutdown(wait=True)
+            self._io_pool = None
+        
+        with self._sct_lock:
+            instances, self._sct_instances = self._sct_instances, []
+        for sct in instances:
+            try:
+                sct.close()
+            except Exception:
+                pass
+        self._sct_local = threading.local()
+    
+    def _is_region_capturable(self, region) -> bool:
+        """
+        判断区域是否可截取：坐标非退化且与屏幕有交集
+        
+        屏幕范围取自所有显示器的外接矩形，按线程随MSS实例缓存
+        """
+        x1, y1, x2, y2 = region
+        if x2 <= x1 or y2 <= y1:
+            return False
+        
+        bounds = getattr(self._sct_local, 'bounds', None)
+        if bounds is None:
+            screen = self._get_sct().monitors[0]
+            bounds = (screen['left'], screen['top'],
+                      screen['left'] + screen['width'], screen['top'] + screen['height'])
+            self._sct_local.bounds = bounds
+        
+        left, top, right, bottom = bounds
+        return x1 < right and x2 > left and y1 < bottom and y2 > top
+    
     def capture_region(self, region: Tuple[int, int, int, int]) -> Optional[np.ndarray]:
         """
         截取指定区域
@@ -481,30 +683,80 @@ class ScreenshotManager:
             return None
         
         try:
+            # 退化或完全在屏幕外的区域直接跳过，不发起截图
+            if not self._is_region_capturable(region):
+                return None
+            
             x1, y1, x2, y2 = region
             width = x2 - x1
             height = y2 - y1
             
-            with mss.mss() as sct:
-                monitor = {
-                    "top": y1,
-                    "left": x1,
-                    "width": width,
-                    "height": height
-                }
-                
-                screenshot = sct.grab(monitor)
-                # 转换为numpy数组
-                img_array = np.array(screenshot)
-                # 转换颜色格式 (BGRA -> RGB)
-                img_array = cv2.cvtColor(img_array, cv2.COLOR_BGRA2RGB)
-                
-                return img_array
+            sct = self._get_sct()
+            monitor = {
+                "top": y1,
+                "left": x1,
+                "width": width,
+                "height": height
+            }
+            
+            screenshot = sct.grab(monitor)
+            # 转换颜色格式 (BGRA -> RGB)：通道反转视图 + 一次连续拷贝
+            img_array = np.ascontiguousarray(np.asarray(screenshot)[..., 2::-1])
+            
+            return img_array
                 
         except Exception as e:
             self.logger.error(f"截图失败: {e}")
             return None
     
+    def _capture_regions_once(self, regions: List[Tuple[int, int, int, int]]) -> List[Optional[np.ndarray]]:
+        """
+        一次抓取覆盖所有区域的外接矩形，再从同一帧中切出各区域
+        
+        Args:
+            regions: 区域坐标列表 [(x1, y1, x2, y2), ...]
+            
+        Returns:
+            与 regions 一一对应的BGRA零拷贝视图列表（指向本次抓取的帧），失败的区域为None。
+            需要RGB图像时取 crop[..., 2::-1] 并复制为连续数组
+        """
+        if not regions:
+            return []
+        
+        try:
+            # 退化或完全在屏幕外的区域直接返回None，不参与外接矩形
+            valid = [self._is_region_capturable(r) for r in regions]
+            capturable = [r for r, ok in zip(regions, valid) if ok]
+            if not capturable:
+                return [None] * len(regions)
+            
+            left = min(r[0] for r in capturable)
+            top = min(r[1] for r in capturable)
+            right = max(r[2] for r in capturable)
+            bottom = max(r[3] for r in capturable)
+            
+            screenshot = self._get_sct().grab({
+                "top": top,
+                "left": left,
+                "width": right - left,
+                "height": bottom - top
+            })
+            # BGRA帧，切片为零拷贝视图，颜色转换留给调用方在需要时进行
+            frame = np.asarray(screenshot)
+            
+            images = []
+            for region, ok in zip(regions, valid):
+                if not ok:
+                    images.append(None)
+                    continue
+                x1, y1, x2, y2 = region
+                images.append(frame[y1 - top:y2 - top, x1 - left:x2 - left])
+            return images
+            
+        except Exception as e:
+            self.logger.error(f"截图失败: {e}")
+            return [None] * len(regions)
+    
     def capture_all_regions(self) -> List[Dict]:
         """
         截取所有启用的区域
@@ -517,53 +769,136 @@ class ScreenshotManager:
         
         results = []
         timestamp = time.time()
+        # 同一轮截图的所有区域共用一个时间字符串
+        time_str = time.strftime("%Y%m%d_%H%M%S", time.localtime(timestamp))
         
-        for region_info in self.screenshot_regions:
-            if not region_info['enabled']:
-                continue
-            
-            region = region_info['region']
-            img_array = self.capture_region(region)
-            
-            if img_array is not None:
-                # 保存图像到文件
-                image_path = self._save_region_image(img_array, region_info['name'], timestamp)
+        enabled_regions = [info for info in self.screenshot_regions if info['enabled']]
+        # 需要保存的 (图像, 路径)，在释放锁之后再交给写盘线程
+        pending_saves = []
+        
+        # 每个线程使用自己的MSS实例，每次抓取得到新的帧，抓取本身无需加锁
+        crops = self._capture_regions_once([info['region'] for info in enabled_regions])
+        
+        with self._frame_lock:
+            for region_info, crop in zip(enabled_regions, crops):
+                region = region_info['region']
                 
-                result = {
-                    'name': region_info['name'],
-                    'region': region,
-                    'image': img_array,
-                    'image_path': image_path,
-                    'timestamp': timestamp,
-                    'enabled': region_info['enabled']
-                }
-                results.append(result)
+                if crop is not None:
+                    # BGRA视图通道反转即为RGB视图，直接与上一帧比较，无需先复制
+                    frame = crop[..., 2::-1]
+                    # 画面与上一帧完全相同则复用上一帧图像和已保存的文件，跳过复制、编码和写盘
+                    name = region_info['name']
+                    previous = self._last_frames.get(name)
+                    unchanged = (previous is not None and previous[0].shape == frame.shape
+                                 and np.array_equal(previous[0], frame))
+                    if unchanged:
+                        img_array, image_path = previous
+                    else:
+                        # 画面变化时才复制一次，得到连续的RGB图像
+                        img_array = np.ascontiguousarray(frame)
+                        # 先确定保存路径，编码写盘在锁外进行
+                        image_path = self._region_image_path(name, time_str)
+                        pending_saves.append((img_array, image_path))
+                        self._last_frames[name] = (img_array, image_path)
+                    
+                    result = {
+                        'name': region_info['name'],
+                        'region': region,
+                        'image': img_array,
+                        'image_path': image_path,
+                        'timestamp': timestamp,
+                        'enabled': region_info['enabled'],
+                        'unchanged': unchanged
+                    }
+                    results.append(result)
+        
+        # 写盘积压时会退回同步编码，放在锁外避免阻塞其他线程的截图
+        for img_array, image_path in pending_saves:
+            self._save_region_image(img_array, image_path)
         
         self.logger.info(f"完成 {len(results)} 个区域的截图")
         return results
     
-    def _save_region_image(self, img_array: np.ndarray, region_name: str, timestamp: float) -> str:
-        """保存区域图像到文件"""
+    def _region_image_path(self, region_name: str, time_str: str) -> str:
+        """
+        生成区域图像的保存路径
+        
+        Args:
+            region_name: 区域名称
+            time_str: 本轮截图的时间字符串 (%Y%m%d_%H%M%S)
+        
+        Returns:
+            图像将要写入的路径
+        """
+        return str(self.screenshot_dir / f"screenshot_{time_str}_{region_name}.png")
+    
+    def _save_region_image(self, img_array: np.ndarray, filepath: str):
+        """
+        保存区域图像到文件（交给后台线程编码写盘）
+        
+        Args:
+            img_array: 区域图像
+            filepath: 保存路径（_region_image_path生成）
+        """
         try:
-            # 生成文件名
-            time_str = time.strftime("%Y%m%d_%H%M%S", time.localtime(timestamp))
-            filename = f"screenshot_{time_str}_{region_name}.png"
-            filepath = self.screenshot_dir / filename
-            
-            # 直接保存，保持原色（MSS已经提供RGB格式）
-            if len(img_array.shape) == 3 and img_array.shape[2] == 3:
-                # 确保是RGB格式（MSS已经提供RGB）
-                img_pil = Image.fromarray(img_array, 'RGB')
-                img_pil.save(filepath)
-            else:
-                # 灰度图像
-                img_pil = Image.fromarray(img_array)
-                img_pil.save(filepath)
-            
-            return str(filepath)
+            try:
+                self._save_queue.put_nowait((img_array, filepath))
+            except queue.Full:
+                # 写盘积压时退回同步保存，保证文件不丢失
+                self._write_region_png(img_array, filepath)
         except Exception as e:
             self.logger.error(f"保存区域图像失败: {e}")
-            return ""
+    
+    def _write_region_png(self, img_array: np.ndarray, filepath: str):
+        """将区域图像编码为PNG写入文件"""
+        if cv2 is not None:
+            # OpenCV按BGR编码；用imencode后自行写文件，避免imwrite不支持中文路径
+            bgr = img_array[..., ::-1] if img_array.ndim == 3 else img_array
+            ok, encoded = cv2.imencode('.png', bgr, [cv2.IMWRITE_PNG_COMPRESSION, 1])
+            if ok:
+                with open(filepath, 'wb') as f:
+                    f.write(encoded.tobytes())
+                return
+        
+        # 直接保存，保持原色（截图已转换为RGB格式）
+        if len(img_array.shape) == 3 and img_array.shape[2] == 3:
+            img_pil = Image.fromarray(img_array, 'RGB')
+        else:
+            # 灰度图像
+            img_pil = Image.fromarray(img_array)
+        # 临时截图使用低压缩级别，编码速度快数倍，文件略大
+        img_pil.save(filepath, compress_level=1)
+    
+    def _save_worker(self):
+        """后台写盘线程：依次保存队列中的区域图像"""
+        while True:
+            img_array, filepath = self._save_queue.get()
+            try:
+                self._write_region_png(img_array, filepath)
+            except Exception as e:
+                self.logger.error(f"保存区域图像失败: {e}")
+            finally:
+                self._save_queue.task_done()
+    
+    def flush_pending_saves(self):
+        """等待所有排队的区域图像写盘完成"""
+        self._save_queue.join()
+    
+    def forget_path(self, image_path: str):
+        """
+        从上一帧缓存中移除引用该文件的条目
+        
+        文件被移动或删除后调用，避免画面未变化时继续返回已失效的路径
+        
+        Args:
+            image_path: 已被移动或删除的图像路径
+        """
+        target = os.path.normcase(os.path.abspath(image_path))
+        with self._frame_lock:
+            stale = [name for name, (_, path) in self._last_frames.items()
+                     if os.path.normcase(os.path.abspath(path)) == target]
+            for name in stale:
+                del self._last_frames[name]
     
     def save_screenshot(self, image_data: np.ndarray, filename: str) -> bool:
         """
@@ -593,7 +928,22 @@ class ScreenshotManager:
     
     def mark_as_shiny(self, image_path: str):
         """标记图像为闪光图片（不会被清理）"""
-        self.shiny_images.add(str(image_path))
+        # 按文件标识记录，清理时的比较不受路径写法（相对/绝对、分隔符、大小写）影响
+        try:
+            st = os.stat(image_path)
+        except FileNotFoundError:
+            # 可能仍在后台写盘队列中，等待写完后重试
+            self.flush_pending_saves()
+            try:
+                st = os.stat(image_path)
+            except OSError as e:
+                self.logger.error(f"标记闪光图片失败 {image_path}: {e}")
+                return
+        except OSError as e:
+            self.logger.error(f"标记闪光图片失败 {image_path}: {e}")
+            return
+        
+        self.shiny_images.add((st.st_dev, st.st_ino))
         self.logger.info(f"标记为闪光图片: {image_path}")
     
     def cleanup_screenshots(self, keep_shiny: bool = True, max_age_hours: int = 24):
@@ -605,31 +955,42 @@ class ScreenshotManager:
             max_age_hours: 保留时间（小时）
         """
         try:
-            import time
+            # 清理后已保存的文件可能不存在，下一帧重新保存
+            with self._frame_lock:
+                self._last_frames.clear()
+            
             current_time = time.time()
             max_age_seconds = max_age_hours * 3600
             
             deleted_count = 0
             kept_count = 0
             
-            for file_path in self.screenshot_dir.glob("*.png"):
-                # 检查是否为闪光图片
-                if keep_shiny and str(file_path) in self.shiny_images:
-                    kept_count += 1
-                    continue
-                
-                # 检查文件年龄
-                file_age = current_time - file_path.stat().st_mtime
-                
-                if file_age > max_age_seconds:
-                    try:
-                        file_path.unlink()  # 删除文件
-                        deleted_count += 1
-                        self.logger.info(f"删除过期截图: {file_path.name}")
-                    except Exception as e:
-                        self.logger.error(f"删除文件失败 {file_path}: {e}")
-                else:
-                    kept_count += 1
+            check_shiny = keep_shiny and bool(self.shiny_images)
+            # 目录内文件同属一个设备；DirEntry.inode() 在各平台都返回真实的文件号
+            dir_dev = os.stat(self.screenshot_dir).st_dev if check_shiny else None
+            
+            with os.scandir(self.screenshot_dir) as entries:
+                for entry in entries:
+                    if not entry.name.endswith('.png'):
+                        continue
+                    
+                    # 检查是否为闪光图片
+                    if check_shiny and (dir_dev, entry.inode()) in self.shiny_images:
+                        kept_count += 1
+                        continue
+                    
+                    # 检查文件年龄
+                    file_age = current_time - entry.stat().st_mtime
+                    
+                    if file_age > max_age_seconds:
+                        try:
+                            os.unlink(entry.path)  # 删除文件
+                            deleted_count += 1
+                            self.logger.info(f"删除过期截图: {entry.name}")
+                        except Exception as e:
+                            self.logger.error(f"删除文件失败 {entry.path}: {e}")
+                    else:
+                        kept_count += 1
             
             self.logger.info(f"截图清理完成: 删除{deleted_count}个, 保留{kept_count}个")
             return deleted_count, kept_count
@@ -649,15 +1010,17 @@ class ScreenshotManager:
         Returns:
             保存的文件路径列表
         """
-        saved_files = []
         timestamp = time.strftime("%Y%m%d_%H%M%S")
+        filenames = [f"{prefix}_{timestamp}_{i+1}_{result['name']}.png"
+                     for i, result in enumerate(results)]
         
-        for i, result in enumerate(results):
-            filename = f"{prefix}_{timestamp}_{i+1}_{result['name']}.png"
-            if self.save_screenshot(result['image'], filename):
-                saved_files.append(str(self.screenshot_dir / filename))
+        # 各截图并行编码写盘，按原顺序收集结果
+        pool = self._get_io_pool()
+        futures = [pool.submit(self.save_screenshot, result['image'], filename)
+                   for result, filename in zip(results, filenames)]
         
-        return saved_files
+        return [str(self.screenshot_dir / filename)
+                for future, filename in zip(futures, filenames) if future.result()]
     
     def start_scheduled_capture(self, interval: float = 1.0, callback=None, auto_save: bool = False):
         """
@@ -679,6 +1042,8 @@ class ScreenshotManager:
         self.is_capturing = True
         
         def capture_loop():
+            # 按截止时间排程，截图耗时不会拉长实际间隔
+            next_deadline = time.monotonic()
             while self.is_capturing:
                 try:
                     results = self.capture_all_regions()
@@ -690,10 +1055,19 @@ class ScreenshotManager:
                     if callback:
                         callback(results)
                     
-                    time.sleep(interval)
+                    next_deadline += interval
+                    delay = next_deadline - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+                    else:
+                        # 本轮超时，从当前时间重新计时，不连续补拍
+                        next_deadline = time.monotonic()
                 except Exception as e:
                     self.logger.error(f"定时截图出错: {e}")
                     break
+            
+            # 线程结束，关闭本线程的MSS实例
+            self.release_thread_resources()
         
         # 在单独线程中运行
         self.capture_thread = threading.Thread(target=capture_loop, daemon=True)
@@ -732,8 +1106,15 @@ class ScreenshotManager:
                 'timestamp': time.time()
             }
             
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=2, ensure_ascii=False)
+            # 先写临时文件再原子替换，写入中途中断也不会留下损坏的配置
+            tmp_path = f"{filepath}.tmp"
+            if orjson is not None:
+                with open(tmp_path, 'wb') as f:
+                    f.write(orjson.dumps(config, option=orjson.OPT_INDENT_2))
+            else:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(config, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, filepath)
             
             self.logger.info(f"区域配置已保存: {filepath}")
         except Exception as e:
@@ -742,8 +1123,8 @@ class ScreenshotManager:
     def load_regions_config(self, filepath: str):
         """从文件加载区域配置"""
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                config = json.load(f)
+            data = Path(filepath).read_bytes()
+            config = orjson.loads(data) if orjson is not None else json.loads(data)
             
             self.screenshot_regions = config.get('regions', [])
             self.logger.info(f"区域配置已加载: {filepath}")